@@ -0,0 +1,335 @@
+"""benchmark runner
+
+Times each stage of the Bitcoin pipeline on synthetic prices, offline,
+and prints one JSON record per stage.
+
+Usage:
+    python -m benchmarks.run --rows 1000000 --freq h --repeat 3
+    python -m benchmarks.run --stages fmt_df find_cycle_lows -o results.jsonl
+"""
+
+import argparse
+import datetime as dt
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from importlib.metadata import version
+from types import SimpleNamespace
+from typing import Any, Callable
+
+import pandas as pd
+
+from btc_cycles.core.halvings import Halvings
+from btc_cycles.core.prices import (
+    Prices,
+    _find_ath,
+    _find_cycle_lows,
+    _find_cycle_progress,
+)
+from btc_cycles.core.sources import Source
+
+from .synthetic import synthetic_prices
+
+PREDICTION = (dt.datetime(2028, 4, 5, tzinfo=dt.timezone.utc), 1050000)
+# granularity of the prices at each synthetic frequency
+GRANULARITY = {"D": "day", "h": "hour", "min": "minute"}
+
+# a stage prepares (untimed) a setup returning the arguments of a run,
+# and names the state key its result is stored under
+Stage = tuple[Callable[[], tuple], Callable[..., Any], str | None]
+
+
+def _stage_import(state: dict) -> Stage:
+    code = (
+        "import time; t = time.perf_counter(); import btc_cycles; "
+        "print(time.perf_counter() - t)"
+    )
+
+    def run() -> float:
+        out = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        return float(out.stdout)
+
+    return tuple, run, None
+
+
+def _stage_source(state: dict) -> Stage:
+    source = Source("cryptocompare")
+    # stub fetcher: no network, returns the synthetic history
+    source._fetch_cryptocompare = lambda coin, fiat, start: state["raw"]
+    return tuple, lambda: source.get_data("BTC", "USD"), None
+
+
+def _stage_fmt_df(state: dict) -> Stage:
+    def run(data):
+        prices = Prices.__new__(Prices)
+        prices.data, prices.halvings = data, state["halvings"]
+        prices.compact, prices.price_dtype = state["compact"], state["price_dtype"]
+        prices._fmt_df()
+        return prices.data
+
+    return lambda: (state["raw"].copy(),), run, "formatted"
+
+
+def _stage_find_ath(state: dict) -> Stage:
+    return lambda: (state["formatted"].copy(),), _find_ath, "ath"
+
+
+def _stage_find_cycle_lows(state: dict) -> Stage:
+    return lambda: (state["ath"].copy(),), _find_cycle_lows, "lows"
+
+
+def _stage_find_cycle_progress(state: dict) -> Stage:
+    return (
+        lambda: (
+            state["lows"].copy(),
+            state["halvings"],
+            pd.Timedelta(1, state["freq"]),
+        ),
+        _find_cycle_progress,
+        "prices",
+    )
+
+
+def _snapshot(state: dict) -> SimpleNamespace:
+    """Minimal stand-in for a Bitcoin object, without network access."""
+    return SimpleNamespace(
+        coin="BTC",
+        currency="USD",
+        granularity=state["granularity"],
+        prices=state["prices"],
+        halvings=state["halvings"],
+        predicted_halving_date=PREDICTION[0],
+        predicted_halving_block=PREDICTION[1],
+    )
+
+
+def _stage_color_bar(state: dict) -> Stage:
+    from btc_cycles.artist.utils import ColorBar
+
+    bitcoin = _snapshot(state)
+
+    def run():
+        colorbar = ColorBar(bitcoin)
+        return colorbar.to_rgba(bitcoin.prices["distance_ath_perc"])
+
+    return tuple, run, None
+
+
+def _stage_progress_labels(state: dict) -> Stage:
+    from btc_cycles.artist.utils import ProgressLabels
+
+    bitcoin = _snapshot(state)
+    return tuple, lambda: ProgressLabels(bitcoin).labels, None
+
+
+def _stage_chart_model(state: dict) -> Stage:
+    from btc_cycles.artist.model import ChartModel
+
+    bitcoin = _snapshot(state)
+    return tuple, lambda: ChartModel(bitcoin), "model"
+
+
+def _stage_static_plot(state: dict) -> Stage:
+    import matplotlib.pyplot as plt
+
+    from btc_cycles.artist.artist import THEMES
+    from btc_cycles.artist.static import StaticArtist
+
+    bitcoin = _snapshot(state)
+
+    def run():
+        fig = StaticArtist(bitcoin, THEMES["light"], model=state["model"]).plot(
+            from_date=None
+        )
+        plt.close(fig)
+
+    return tuple, run, None
+
+
+def _stage_interactive_plot(state: dict) -> Stage:
+    from btc_cycles.artist.artist import THEMES
+    from btc_cycles.artist.interactive import InteractiveArtist
+
+    bitcoin = _snapshot(state)
+
+    def run():
+        return InteractiveArtist(bitcoin, THEMES["light"], model=state["model"]).plot(
+            from_date=None
+        )
+
+    return tuple, run, None
+
+
+STAGES: dict[str, Callable[[dict], Stage]] = {
+    "import": _stage_import,
+    "source": _stage_source,
+    "fmt_df": _stage_fmt_df,
+    "find_ath": _stage_find_ath,
+    "find_cycle_lows": _stage_find_cycle_lows,
+    "find_cycle_progress": _stage_find_cycle_progress,
+    "color_bar": _stage_color_bar,
+    "progress_labels": _stage_progress_labels,
+    "chart_model": _stage_chart_model,
+    "static_plot": _stage_static_plot,
+    "interactive_plot": _stage_interactive_plot,
+}
+
+
+def _measure(stage: Stage, repeat: int) -> tuple[list[float], int, Any]:
+    """Time `repeat` runs, then measure peak allocation in one more run."""
+    setup, run, _ = stage
+    times = []
+    for _ in range(repeat):
+        args = setup()
+        start = time.perf_counter()
+        result = run(*args)
+        times.append(time.perf_counter() - start)
+
+    args = setup()
+    tracemalloc.start()
+    try:
+        result = run(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return times, peak, result
+
+
+def _commit() -> str | None:
+    """Current git commit, if running from a checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(
+    rows: int | None = None,
+    freq: str = "D",
+    repeat: int = 3,
+    stages: list[str] | None = None,
+    seed: int = 0,
+    compact: bool = False,
+    price_dtype: str = "float64",
+) -> list[dict]:
+    """Run the benchmark stages on a synthetic price history.
+
+    Stages always run in pipeline order, since later ones consume the
+    output of earlier ones; `stages` only selects which are reported.
+
+    Args:
+        rows: Number of synthetic rows. If None, the full daily history.
+        freq: Pandas frequency of the rows ("D", "h", "min").
+        repeat: Timed runs per stage.
+        stages: Stages to report. Defaults to all.
+        seed: Random seed of the synthetic prices.
+        compact: Use the compact layout of the prices.
+        price_dtype: Float dtype of the prices.
+
+    Returns:
+        One record per reported stage.
+
+    Raises:
+        ValueError: If a stage is unknown, or `repeat` is less than 1.
+    """
+    if repeat < 1:
+        raise ValueError("repeat must be at least 1")
+    selected = set(stages or STAGES)
+    unknown = selected - set(STAGES)
+    if unknown:
+        raise ValueError(f"unknown stages: {sorted(unknown)}")
+
+    state = {
+        "raw": synthetic_prices(rows, freq=freq, seed=seed),
+        "halvings": Halvings(prediction=PREDICTION).data,
+        "compact": compact,
+        "price_dtype": price_dtype,
+        "freq": freq,
+        "granularity": GRANULARITY.get(freq, "day"),
+    }
+    context = {
+        "rows": len(state["raw"]),
+        "freq": freq,
+        "compact": compact,
+        "price_dtype": price_dtype,
+        "repeat": repeat,
+        "version": version("btc-cycles"),
+        "commit": _commit(),
+        "python": platform.python_version(),
+    }
+
+    # stages whose output feeds the selected ones must run too
+    last = max(list(STAGES).index(name) for name in selected)
+    records = []
+    for name, make_stage in list(STAGES.items())[: last + 1]:
+        stage = make_stage(state)
+        key = stage[2]
+        if name not in selected and key is None:
+            continue
+        times, peak, result = _measure(stage, repeat if name in selected else 0)
+        if key is not None:
+            state[key] = result
+        if name in selected:
+            record = {
+                "stage": name,
+                **context,
+                "seconds": min(times),
+                "median_seconds": statistics.median(times),
+                "peak_bytes": peak,
+            }
+            if isinstance(result, pd.DataFrame):
+                record["result_bytes"] = int(result.memory_usage(deep=True).sum())
+            records.append(record)
+    return records
+
+
+def _positive_int(value: str) -> int:
+    """Parse a command line integer of at least 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=None)
+    parser.add_argument("--freq", default="D")
+    parser.add_argument("--repeat", type=_positive_int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--compact", action="store_true")
+    parser.add_argument("--price-dtype", default="float64")
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), default=None)
+    parser.add_argument("-o", "--output", default=None, help="append JSON lines")
+    args = parser.parse_args(argv)
+
+    records = run_benchmarks(
+        rows=args.rows,
+        freq=args.freq,
+        repeat=args.repeat,
+        stages=args.stages,
+        seed=args.seed,
+        compact=args.compact,
+        price_dtype=args.price_dtype,
+    )
+    lines = "".join(json.dumps(record) + "\n" for record in records)
+    if args.output is None:
+        sys.stdout.write(lines)
+    else:
+        with open(args.output, "a") as f:
+            f.write(lines)
+
+
+if __name__ == "__main__":
+    main()
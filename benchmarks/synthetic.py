@@ -0,0 +1,50 @@
+"""synthetic price generator"""
+
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+
+from btc_cycles.core.sources.source import START
+
+# rough shape of the real series, as yearly log-return drift and volatility
+ANNUAL_DRIFT = 0.9
+ANNUAL_VOLATILITY = 0.8
+START_PRICE = 0.05
+
+
+def synthetic_prices(
+    n_rows: int | None = None,
+    freq: str = "D",
+    start: dt.datetime = START,
+    end: dt.datetime | None = None,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """Generate a random-walk price history with the source schema.
+
+    Args:
+        n_rows: Number of rows. If None, covers `start` to `end`.
+        freq: Pandas frequency of the rows ("D", "h", "min").
+        start: First date.
+        end: Last date when `n_rows` is None. Defaults to now.
+        seed: Random seed.
+
+    Returns:
+        Prices with naive UTC Date and Close columns, sorted by date,
+        as returned by `Source.get_data`.
+    """
+    if n_rows is None:
+        dates = pd.date_range(start, end or dt.datetime.now(), freq=freq)
+    else:
+        dates = pd.date_range(start, periods=n_rows, freq=freq)
+
+    step = np.diff(pd.date_range(start, periods=2, freq=freq))[0]
+    steps_per_year = pd.Timedelta(days=365) / step
+    rng = np.random.default_rng(seed)
+    log_returns = rng.normal(
+        ANNUAL_DRIFT / steps_per_year,
+        ANNUAL_VOLATILITY / np.sqrt(steps_per_year),
+        len(dates),
+    )
+    close = START_PRICE * np.exp(np.cumsum(log_returns))
+    return pd.DataFrame({"Date": dates, "Close": close})
@@ -1,6 +1,25 @@
 """artist submodule"""
 
-from .artist import Artist
-from .interactive import InteractiveArtist
+import importlib
+from typing import TYPE_CHECKING
 
-__all__ = ["Artist", "InteractiveArtist"]
+if TYPE_CHECKING:
+    from .artist import Artist
+    from .interactive import InteractiveArtist
+    from .model import ChartModel
+
+__all__ = ["Artist", "ChartModel", "InteractiveArtist"]
+
+# backends are imported on first access, so that importing the package
+# does not pull in matplotlib, plotly and scipy
+_LAZY = {
+    "Artist": ".artist",
+    "ChartModel": ".model",
+    "InteractiveArtist": ".interactive",
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY:
+        return getattr(importlib.import_module(_LAZY[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -4,14 +4,16 @@ import datetime
 import warnings
 from typing import TYPE_CHECKING, Literal, Union
 
-from .interactive import InteractiveArtist
-from .static import StaticArtist
+from ..instrumentation import stage
 
 if TYPE_CHECKING:
     import matplotlib.figure
     import plotly.graph_objects as go
 
     from ..core.bitcoin import Bitcoin
+    from .interactive import InteractiveArtist
+    from .model import ChartModel
+    from .static import StaticArtist
 
 THEMES: dict[str, dict[str, str]] = {
     "light": {
@@ -44,6 +46,8 @@ class Artist:
         bitcoin: Bitcoin object with price and halving data.
         kind: Type of artist ("static" or "interactive").
         theme: Theme colors — a preset name or a dict of overrides.
+        model: Precomputed chart model of `bitcoin`, shared between
+            renders. Built if None.
 
     Raises:
         ValueError: If kind or theme is invalid.
@@ -54,17 +58,23 @@ class Artist:
         bitcoin: "Bitcoin",
         kind: Literal["static", "interactive"],
         theme: Literal["light", "dark"] | dict[str, str],
+        model: "ChartModel | None" = None,
     ):
         self.theme: dict[str, str] = self.__unwrap_theme(theme)
 
+        # only the selected backend is imported
         if kind == "static":
+            from .static import StaticArtist
+
             self._kind = kind
-            self.artist: StaticArtist | InteractiveArtist = StaticArtist(
-                bitcoin, theme=self.theme
+            self.artist: "StaticArtist | InteractiveArtist" = StaticArtist(
+                bitcoin, theme=self.theme, model=model
             )
         elif kind == "interactive":
+            from .interactive import InteractiveArtist
+
             self._kind = kind
-            self.artist = InteractiveArtist(bitcoin, theme=self.theme)
+            self.artist = InteractiveArtist(bitcoin, theme=self.theme, model=model)
         else:
             raise ValueError("kind must be 'static' or 'interactive'")
 
@@ -110,4 +120,5 @@ class Artist:
         Returns:
             A matplotlib Figure (static) or Plotly Figure (interactive).
         """
-        return self.artist.plot(from_date=from_date)
+        with stage(f"render_{self.kind}"):
+            return self.artist.plot(from_date=from_date)
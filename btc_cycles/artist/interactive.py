@@ -1,48 +1,55 @@
 """interactive artist module"""
 
-import copy
 import datetime
 from importlib.metadata import version
 from typing import TYPE_CHECKING
 
 import matplotlib.colors as mcolors
-import matplotlib.pyplot as plt
 import numpy as np
 import plotly.graph_objects as go
-from scipy.stats import gaussian_kde
 
-from .utils import ColorBar, ProgressLabels
+from .model import KDE_MAX_ALPHA, PRICE_UPPER_BOUND, ChartModel
 
 if TYPE_CHECKING:
+    import pandas as pd
+
     from ..core.bitcoin import Bitcoin
 
-# chart constants (shared with static)
-PRICE_UPPER_BOUND = 1_000_000
-KDE_MAX_ALPHA = 0.15
-KDE_DENSITY_THRESHOLD = 0.10
+
+def _date_labels(dates: "pd.Series", granularity: str = "day") -> np.ndarray:
+    """Format dates as strings in one vectorized call.
+
+    Daily dates are formatted as YYYY-MM-DD, intraday ones with the time
+    down to the minute.
+    """
+    unit = "D" if granularity == "day" else "m"
+    labels = np.datetime_as_string(dates.to_numpy(dtype="datetime64[ns]"), unit=unit)
+    return labels if unit == "D" else np.char.replace(labels, "T", " ")
 
 
 class InteractiveArtist:
     """Interactive polar chart artist using Plotly.
 
+    The bitcoin prices are only read; derived data such as colors comes
+    from the chart model.
+
     Args:
         bitcoin: Bitcoin object with price and halving data.
         theme: Theme color dictionary.
+        model: Precomputed chart model of `bitcoin`. Built if None.
     """
 
-    def __init__(self, bitcoin: "Bitcoin", theme: dict[str, str]):
-        self.bitcoin = copy.deepcopy(bitcoin)
-        self.colorbar = ColorBar(self.bitcoin)
+    def __init__(
+        self,
+        bitcoin: "Bitcoin",
+        theme: dict[str, str],
+        model: ChartModel | None = None,
+    ):
+        self.bitcoin = bitcoin
+        self.model = model if model is not None else ChartModel(bitcoin)
+        self.colorbar = self.model.colorbar
         self.theme = theme
 
-        self._set_colors()
-
-    def _set_colors(self) -> None:
-        """Create a color column based on distance from ATH."""
-        self.bitcoin.prices["color"] = self.bitcoin.prices["distance_ath_perc"].apply(
-            lambda x: mcolors.to_hex(self.colorbar.cmap(self.colorbar.norm(x)))
-        )
-
     def plot(
         self,
         from_date: str | datetime.datetime | None,
@@ -55,12 +62,9 @@ class InteractiveArtist:
         Returns:
             The Plotly figure.
         """
-        if from_date is not None:
-            self.display_data = self.bitcoin.prices[
-                self.bitcoin.prices.Date >= from_date
-            ]
-        else:
-            self.display_data = self.bitcoin.prices
+        self.view = self.model.view(from_date)
+        self.display_data = self.view.data
+        self.display_colors = self.view.hex
 
         self.fig = go.Figure()
 
@@ -79,15 +83,6 @@ class InteractiveArtist:
         """Add scatter data trace."""
         theta_deg = self.display_data["cycle_progress"] * 360
 
-        hover_text = [
-            f"Date: {row.Date.strftime('%Y-%m-%d')}<br>"
-            f"Price: ${row.Close:,.2f}<br>"
-            f"Cycle: {int(row.cycle_id)}<br>"
-            f"Progress: {row.cycle_progress:.1%}<br>"
-            f"ATH distance: {row.distance_ath_perc:.1%}"
-            for _, row in self.display_data.iterrows()
-        ]
-
         self.fig.add_trace(
             go.Scatterpolar(
                 r=self.display_data["Close"],
@@ -95,10 +90,20 @@ class InteractiveArtist:
                 mode="markers",
                 marker=dict(
                     size=3,
-                    color=self.display_data["color"].tolist(),
+                    color=self.display_colors.tolist(),
+                ),
+                text=_date_labels(self.display_data["Date"], self.model.granularity),
+                customdata=self.display_data[
+                    ["cycle_id", "cycle_progress", "distance_ath_perc"]
+                ].to_numpy(dtype=float),
+                hovertemplate=(
+                    "Date: %{text}<br>"
+                    f"Price: %{{r:,.2f}} {self.model.currency}<br>"
+                    "Cycle: %{customdata[0]:.0f}<br>"
+                    "Progress: %{customdata[1]:.1%}<br>"
+                    "ATH distance: %{customdata[2]:.1%}"
+                    "<extra></extra>"
                 ),
-                text=hover_text,
-                hoverinfo="text",
                 showlegend=False,
             )
         )
@@ -107,9 +112,12 @@ class InteractiveArtist:
         """Add current price marker and radial line."""
         last = self.display_data.iloc[-1]
         theta_now = last["cycle_progress"] * 360
+        date_format = (
+            "%Y-%m-%d" if self.model.granularity == "day" else "%Y-%m-%d %H:%M"
+        )
 
         # radial line from min to current price
-        r_min = self.display_data["Close"].min()
+        r_min = self.view.r_min
         self.fig.add_trace(
             go.Scatterpolar(
                 r=[r_min, last["Close"]],
@@ -133,13 +141,13 @@ class InteractiveArtist:
                 mode="markers",
                 marker=dict(
                     size=10,
-                    color=last["color"],
+                    color=self.display_colors[-1],
                     symbol="diamond",
                 ),
                 text=[
                     f"Today<br>"
-                    f"Date: {last['Date'].strftime('%Y-%m-%d')}<br>"
-                    f"Price: ${last['Close']:,.2f}"
+                    f"Date: {last['Date'].strftime(date_format)}<br>"
+                    f"Price: {last['Close']:,.2f} {self.model.currency}"
                 ],
                 hoverinfo="text",
                 showlegend=False,
@@ -148,7 +156,7 @@ class InteractiveArtist:
 
     def _add_halving(self) -> None:
         """Add halving day radial line."""
-        r_min = self.display_data["Close"].min()
+        r_min = self.view.r_min
         self.fig.add_trace(
             go.Scatterpolar(
                 r=[r_min, PRICE_UPPER_BOUND],
@@ -165,15 +173,10 @@ class InteractiveArtist:
 
     def _add_aths(self) -> None:
         """Add all-time high markers."""
-        aths = self.display_data[self.display_data["distance_ath_perc"] == 0]
+        aths = self.view.aths
         if aths.empty:
             return
 
-        hover_text = [
-            f"ATH<br>Date: {row.Date.strftime('%Y-%m-%d')}<br>Price: ${row.Close:,.2f}"
-            for _, row in aths.iterrows()
-        ]
-
         self.fig.add_trace(
             go.Scatterpolar(
                 r=aths["Close"],
@@ -184,25 +187,21 @@ class InteractiveArtist:
                     color=self.theme["ath_marker"],
                     symbol="x",
                 ),
-                text=hover_text,
-                hoverinfo="text",
+                text=_date_labels(aths["Date"], self.model.granularity),
+                hovertemplate=(
+                    "ATH<br>Date: %{text}<br>"
+                    f"Price: %{{r:,.2f}} {self.model.currency}<extra></extra>"
+                ),
                 showlegend=False,
             )
         )
 
     def _add_bottoms(self) -> None:
         """Add cycle low markers."""
-        lows = self.display_data[self.display_data["is_cycle_low"]]
+        lows = self.view.lows
         if lows.empty:
             return
 
-        hover_text = [
-            f"Cycle Low<br>Date: {row.Date.strftime('%Y-%m-%d')}<br>"
-            f"Price: ${row.Close:,.2f}<br>"
-            f"ATH distance: {row.distance_ath_perc:.1%}"
-            for _, row in lows.iterrows()
-        ]
-
         self.fig.add_trace(
             go.Scatterpolar(
                 r=lows["Close"],
@@ -213,72 +212,50 @@ class InteractiveArtist:
                     color=self.theme["low_marker"],
                     symbol="triangle-down",
                 ),
-                text=hover_text,
-                hoverinfo="text",
+                text=_date_labels(lows["Date"], self.model.granularity),
+                customdata=lows["distance_ath_perc"].to_numpy(dtype=float),
+                hovertemplate=(
+                    "Cycle Low<br>Date: %{text}<br>"
+                    f"Price: %{{r:,.2f}} {self.model.currency}<br>"
+                    "ATH distance: %{customdata:.1%}"
+                    "<extra></extra>"
+                ),
                 showlegend=False,
             )
         )
 
-    def _add_low_probability_band(self, n_bins: int = 100) -> None:
+    def _add_low_probability_band(self) -> None:
         """Add shaded radial band showing cycle low probability density."""
-        lows = self.bitcoin.prices[self.bitcoin.prices["is_cycle_low"]]
-        if len(lows) < 2:
+        if len(self.model.band_progress) == 0:
             return
 
-        progress_values = lows["cycle_progress"].values
-
-        # exclude outliers using IQR
-        q1, q3 = np.percentile(progress_values, [25, 75])
-        iqr = q3 - q1
-        mask = (progress_values >= q1 - 1.5 * iqr) & (progress_values <= q3 + 1.5 * iqr)
-        filtered = progress_values[mask]
-        if len(filtered) < 2:
-            return
-
-        kde = gaussian_kde(filtered)
-
-        grid = np.linspace(0, 1, n_bins + 1)
-        centers = (grid[:-1] + grid[1:]) / 2
-        density = kde(centers)
-        density_norm = density / density.max()
-
-        r_min = self.display_data["Close"].min()
+        r_min = self.view.r_min
         r_max = PRICE_UPPER_BOUND
 
         color_rgb = mcolors.to_rgb(self.theme["low_marker"])
         r_int, g_int, b_int = [int(c * 255) for c in color_rgb]
-        bin_width_deg = (grid[1] - grid[0]) * 360
-
-        for center, d in zip(centers, density_norm):
-            if d < KDE_DENSITY_THRESHOLD:
-                continue
-            theta_center = center * 360
-            alpha = d * KDE_MAX_ALPHA
-
-            theta_left = theta_center - bin_width_deg / 2
-            theta_right = theta_center + bin_width_deg / 2
-            self.fig.add_trace(
-                go.Scatterpolar(
-                    r=[r_min, r_max, r_max, r_min, r_min],
-                    theta=[
-                        theta_left,
-                        theta_left,
-                        theta_right,
-                        theta_right,
-                        theta_left,
+
+        # one bar per bin in a single trace, alpha encoded in the colors
+        self.fig.add_trace(
+            go.Barpolar(
+                r=np.full(len(self.model.band_progress), r_max - r_min),
+                base=r_min,
+                theta=self.model.band_progress * 360,
+                width=self.model.band_width * 360,
+                marker=dict(
+                    color=[
+                        f"rgba({r_int},{g_int},{b_int},{alpha})"
+                        for alpha in self.model.band_density * KDE_MAX_ALPHA
                     ],
-                    mode="lines",
-                    fill="toself",
-                    fillcolor=f"rgba({r_int},{g_int},{b_int},{alpha})",
                     line=dict(width=0),
-                    hoverinfo="skip",
-                    showlegend=False,
-                )
+                ),
+                hoverinfo="skip",
+                showlegend=False,
             )
+        )
 
     def _add_legend(self) -> None:
         """Add proxy legend traces matching the static chart's legend order."""
-        last = self.display_data.iloc[-1]
         color_rgb = mcolors.to_rgb(self.theme["low_marker"])
         r_int, g_int, b_int = [int(c * 255) for c in color_rgb]
 
@@ -290,14 +267,14 @@ class InteractiveArtist:
                 theta=[None],
                 mode="markers",
                 marker=dict(size=5, color="grey"),
-                name="BTC/USD",
+                name=self.model.pair,
             ),
             go.Scatterpolar(
                 r=[None],
                 theta=[None],
                 mode="markers",
-                marker=dict(size=8, color=last["color"], symbol="diamond"),
-                name="Today BTC/USD Close",
+                marker=dict(size=8, color=self.display_colors[-1], symbol="diamond"),
+                name=f"Today {self.model.pair} Close",
             ),
             go.Scatterpolar(
                 r=[None],
@@ -346,10 +323,9 @@ class InteractiveArtist:
         """Build angular axis date labels from ProgressLabels, converting to HTML."""
         import re
 
-        pl = ProgressLabels(self.bitcoin)
         labels = []
         for progress in [0.00, 0.25, 0.50, 0.75]:
-            raw = pl.labels.loc[progress]
+            raw = self.model.labels.loc[progress]
             # convert matplotlib LaTeX bold to HTML bold
             converted = re.sub(
                 r"\$\\bf\{([^}]+)\}\$",
@@ -365,38 +341,6 @@ class InteractiveArtist:
         bg = self.theme["background"]
         text_color = self.theme["text"]
 
-        # build tick labels for the r-axis (log scale)
-        grid_intervals = [
-            0.001,
-            0.01,
-            0.1,
-            1,
-            10,
-            100,
-            1000,
-            10000,
-            100000,
-            PRICE_UPPER_BOUND,
-        ]
-        labels = [
-            "0.001",
-            "0.01",
-            "0.1",
-            "1",
-            "10",
-            "100",
-            "1k",
-            "10k",
-            "100k",
-            "1M",
-        ]
-
-        start_index = next(
-            i
-            for i, v in enumerate(grid_intervals)
-            if v >= self.display_data.Close.min()
-        )
-
         # build watermark text
         try:
             date = datetime.datetime.now(datetime.UTC)
@@ -406,9 +350,9 @@ class InteractiveArtist:
         watermark = f"{date_text} | btc-cycles : {version('btc-cycles')}"
 
         # distance-from-ATH colorbar via invisible trace
-        cmap = plt.get_cmap("cool")
+        colors = self.colorbar.hex[:-1]
         plotly_colorscale = [
-            [i / 255, mcolors.to_hex(cmap(i / 255))] for i in range(256)
+            [i / (len(colors) - 1), color] for i, color in enumerate(colors)
         ]
 
         self.fig.add_trace(
@@ -420,7 +364,7 @@ class InteractiveArtist:
                     size=0,
                     color=[0],
                     colorscale=plotly_colorscale,
-                    cmin=self.bitcoin.prices["distance_ath_perc"].min(),
+                    cmin=self.colorbar.norm.vmin,
                     cmax=0,
                     colorbar=dict(
                         title=dict(text="Distance from ATH"),
@@ -445,11 +389,11 @@ class InteractiveArtist:
                 radialaxis=dict(
                     type="log",
                     range=[
-                        np.log10(self.display_data["Close"].min()),
+                        np.log10(self.view.r_min),
                         np.log10(PRICE_UPPER_BOUND),
                     ],
-                    tickvals=grid_intervals[start_index:],
-                    ticktext=labels[start_index:],
+                    tickvals=self.view.grid_intervals,
+                    ticktext=self.view.grid_labels,
                     gridcolor=self.theme["grid"],
                     color=text_color,
                     angle=90,
@@ -468,7 +412,7 @@ class InteractiveArtist:
             plot_bgcolor=bg,
             font=dict(color=text_color),
             title=dict(
-                text="BTCUSD price halving cycles",
+                text=f"{self.model.pair.replace('/', '')} price halving cycles",
                 font=dict(size=16, color=text_color),
                 x=0.5,
             ),
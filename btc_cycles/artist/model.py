@@ -0,0 +1,164 @@
+"""chart model module"""
+
+import datetime
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+from scipy.stats import gaussian_kde
+
+from ..instrumentation import stage
+from .utils import ColorBar, ProgressLabels, display_start
+
+if TYPE_CHECKING:
+    from ..core.bitcoin import Bitcoin
+
+# chart constants (shared by all artists)
+PRICE_UPPER_BOUND = 1_000_000
+KDE_MAX_ALPHA = 0.15
+KDE_DENSITY_THRESHOLD = 0.10
+
+GRID_INTERVALS = [
+    0.001,
+    0.01,
+    0.1,
+    1,
+    10,
+    100,
+    1000,
+    10000,
+    100000,
+    PRICE_UPPER_BOUND,
+]
+GRID_LABELS = [
+    "0.001",
+    "0.01",
+    "0.1",
+    "1",
+    "10",
+    "100",
+    "1k",
+    "10k",
+    "100k",
+    "1M",
+]
+
+
+class ChartModel:
+    """Backend-independent render model of a Bitcoin snapshot.
+
+    Holds everything the artists derive from the price data, so that
+    rendering several kinds and themes of the same snapshot computes
+    it only once. The bitcoin prices are only read.
+
+    Args:
+        bitcoin: Bitcoin object with price and halving data.
+        n_bins: Number of angular bins for the cycle low probability band.
+
+    Attributes:
+        bitcoin: Bitcoin object the model was built from.
+        prices: Prices of `bitcoin` the model was built from. Views are
+            sliced from them, so the model stays consistent even if the
+            prices of `bitcoin` are replaced.
+        pair: Coin and currency symbols, e.g. "BTC/USD".
+        currency: Currency symbol of the prices, e.g. "USD".
+        granularity: Period of the prices, "day", "hour" or "minute".
+        colorbar: Distance-from-ATH color mapping.
+        rgba: RGBA color of each price.
+        hex: Hex color of each price.
+        band_progress: Cycle progress of the probability band bins shown.
+        band_density: Normalized low probability density of those bins.
+        band_width: Width of a band bin, as a fraction of the cycle.
+        labels: Progress labels for the angular axis ticks.
+    """
+
+    def __init__(self, bitcoin: "Bitcoin", n_bins: int = 100):
+        self.bitcoin = bitcoin
+        self.prices = bitcoin.prices
+        self.pair = f"{bitcoin.coin}/{bitcoin.currency}"
+        self.currency = bitcoin.currency
+        self.granularity = bitcoin.granularity
+        with stage("chart_model", rows=len(self.prices)):
+            self.colorbar = ColorBar(bitcoin)
+            self.rgba = self.colorbar.to_rgba(self.prices["distance_ath_perc"])
+            self.hex = self.colorbar.to_hex(self.prices["distance_ath_perc"])
+            self._set_band(n_bins)
+            self.labels = ProgressLabels(bitcoin).labels
+
+    def _set_band(self, n_bins: int) -> None:
+        """Estimate where in the cycle the bottom is most likely to occur.
+
+        Uses KDE on historical cycle low progress values, keeping the
+        bins whose normalized density is above the display threshold.
+        """
+        self.band_progress = np.empty(0)
+        self.band_density = np.empty(0)
+        self.band_width = 1 / n_bins
+
+        prices = self.prices
+        progress_values = prices["cycle_progress"].to_numpy()[
+            prices["is_cycle_low"].to_numpy(dtype=bool)
+        ]
+        if len(progress_values) < 2:
+            return
+
+        # exclude outliers using IQR
+        q1, q3 = np.percentile(progress_values, [25, 75])
+        iqr = q3 - q1
+        mask = (progress_values >= q1 - 1.5 * iqr) & (progress_values <= q3 + 1.5 * iqr)
+        filtered = progress_values[mask]
+        if len(filtered) < 2:
+            return
+
+        kde = gaussian_kde(filtered)
+
+        grid = np.linspace(0, 1, n_bins + 1)
+        centers = (grid[:-1] + grid[1:]) / 2
+        density = kde(centers)
+        density_norm = density / density.max()
+
+        shown = density_norm >= KDE_DENSITY_THRESHOLD
+        self.band_progress = centers[shown]
+        self.band_density = density_norm[shown]
+
+    def view(self, from_date: str | datetime.datetime | None) -> "ChartView":
+        """Select the data displayed from `from_date` on.
+
+        Args:
+            from_date: Start date for display filtering.
+
+        Returns:
+            The displayed slice of the model.
+        """
+        return ChartView(self, display_start(self.prices, from_date))
+
+
+class ChartView:
+    """Displayed slice of a chart model.
+
+    Args:
+        model: Chart model to slice.
+        start: Position of the first displayed price.
+
+    Attributes:
+        data: Displayed prices, a slice of the shared frame.
+        rgba: RGBA color of each displayed price.
+        hex: Hex color of each displayed price.
+        aths: Displayed all-time highs.
+        lows: Displayed cycle lows.
+        r_min: Lowest displayed price.
+        grid_intervals: Radial grid values from the lowest displayed price up.
+        grid_labels: Labels of the radial grid values.
+    """
+
+    def __init__(self, model: ChartModel, start: int):
+        self.data: pd.DataFrame = model.prices.iloc[start:]
+        self.rgba = model.rgba[start:]
+        self.hex = model.hex[start:]
+        self.aths = self.data[self.data["distance_ath_perc"] == 0]
+        self.lows = self.data[self.data["is_cycle_low"].to_numpy(dtype=bool)]
+        self.r_min = self.data["Close"].min()
+
+        grid_start = next(i for i, v in enumerate(GRID_INTERVALS) if v >= self.r_min)
+        self.grid_intervals = GRID_INTERVALS[grid_start:]
+        self.grid_labels = GRID_LABELS[grid_start:]
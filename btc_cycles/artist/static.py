@@ -1,6 +1,5 @@
 """static artist module"""
 
-import copy
 import datetime
 from importlib.metadata import version
 from typing import TYPE_CHECKING
@@ -8,40 +7,36 @@ from typing import TYPE_CHECKING
 import matplotlib.colors as mcolors
 import matplotlib.pyplot as plt
 import numpy as np
-from scipy.stats import gaussian_kde
 
-from .utils import ColorBar, ProgressLabels
+from .model import KDE_MAX_ALPHA, PRICE_UPPER_BOUND, ChartModel
 
 if TYPE_CHECKING:
     from ..core.bitcoin import Bitcoin
 
-# chart constants
-PRICE_UPPER_BOUND = 1_000_000
-KDE_MAX_ALPHA = 0.15
-KDE_DENSITY_THRESHOLD = 0.10
-
 
 class StaticArtist:
     """Static polar chart artist using matplotlib.
 
+    The bitcoin prices are only read; derived data such as colors comes
+    from the chart model.
+
     Args:
         bitcoin: Bitcoin object with price and halving data.
         theme: Theme color dictionary.
+        model: Precomputed chart model of `bitcoin`. Built if None.
     """
 
-    def __init__(self, bitcoin: "Bitcoin", theme: dict[str, str]):
-        self.bitcoin = copy.deepcopy(bitcoin)
-        self.colorbar = ColorBar(self.bitcoin)
+    def __init__(
+        self,
+        bitcoin: "Bitcoin",
+        theme: dict[str, str],
+        model: ChartModel | None = None,
+    ):
+        self.bitcoin = bitcoin
+        self.model = model if model is not None else ChartModel(bitcoin)
+        self.colorbar = self.model.colorbar
         self.theme = theme
 
-        self._set_colors()
-
-    def _set_colors(self) -> None:
-        """Create a color column based on distance from ATH."""
-        self.bitcoin.prices["color"] = self.bitcoin.prices["distance_ath_perc"].apply(
-            lambda x: mcolors.to_hex(self.colorbar.cmap(self.colorbar.norm(x)))
-        )
-
     def plot(
         self,
         from_date: str | datetime.datetime | None,
@@ -97,18 +92,15 @@ class StaticArtist:
         Args:
             from_date: Start date for filtering.
         """
-        if from_date is not None:
-            self.display_data = self.bitcoin.prices[
-                self.bitcoin.prices.Date >= from_date
-            ]
-        else:
-            self.display_data = self.bitcoin.prices
+        self.view = self.model.view(from_date)
+        self.display_data = self.view.data
+        self.display_colors = self.view.rgba
 
         self.axes.scatter(
             self.display_data["cycle_progress"] * 2 * np.pi,
             self.display_data["Close"].to_numpy(),
             s=3,
-            c=self.display_data["color"],
+            c=self.display_colors,
             zorder=9,
         )
 
@@ -118,49 +110,17 @@ class StaticArtist:
         self.axes.set_theta_direction(-1)
         self.axes.set_theta_offset(np.pi / 2.0)
 
-        grid_intervals = [
-            0.001,
-            0.01,
-            0.1,
-            1,
-            10,
-            100,
-            1000,
-            10000,
-            100000,
-            PRICE_UPPER_BOUND,
-        ]
-
-        labels = [
-            "0.001",
-            "0.01",
-            "0.1",
-            "1",
-            "10",
-            "100",
-            "1k",
-            "10k",
-            "100k",
-            "1M",
-        ]
-
-        start_index = next(
-            i
-            for i, v in enumerate(grid_intervals)
-            if v >= self.display_data.Close.min()
-        )
-
         self.axes.grid(color=self.theme["grid"])
         self.axes.set_rgrids(
-            grid_intervals[start_index:],
-            labels=labels[start_index:],
+            self.view.grid_intervals,
+            labels=self.view.grid_labels,
         )
 
         self.axes.set_xticks(
             np.linspace(0, 2 * np.pi, 4, endpoint=False),
         )
         self.axes.set_xticklabels(
-            ProgressLabels(self.bitcoin).labels,
+            self.model.labels,
             fontsize=8,
         )
 
@@ -175,7 +135,7 @@ class StaticArtist:
 
     def add_bottoms(self) -> None:
         """Add cycle low markers to plot."""
-        lows = self.display_data[self.display_data["is_cycle_low"]]
+        lows = self.view.lows
         self.axes.scatter(
             lows["cycle_progress"] * 2 * np.pi,
             lows["Close"],
@@ -185,60 +145,33 @@ class StaticArtist:
             zorder=10,
         )
 
-    def add_low_probability_band(self, n_bins: int = 100) -> None:
-        """Add shaded radial band showing cycle low probability density.
-
-        Uses KDE on historical cycle low progress values to estimate
-        where in the cycle the bottom is most likely to occur.
-
-        Args:
-            n_bins: Number of angular bins for the shading.
-        """
-        lows = self.bitcoin.prices[self.bitcoin.prices["is_cycle_low"]]
-        if len(lows) < 2:
+    def add_low_probability_band(self) -> None:
+        """Add shaded radial band showing cycle low probability density."""
+        if len(self.model.band_progress) == 0:
             return
 
-        progress_values = lows["cycle_progress"].values
-
-        # exclude outliers using IQR
-        q1, q3 = np.percentile(progress_values, [25, 75])
-        iqr = q3 - q1
-        mask = (progress_values >= q1 - 1.5 * iqr) & (progress_values <= q3 + 1.5 * iqr)
-        filtered = progress_values[mask]
-        if len(filtered) < 2:
-            return
-
-        kde = gaussian_kde(filtered)
-
-        grid = np.linspace(0, 1, n_bins + 1)
-        centers = (grid[:-1] + grid[1:]) / 2
-        density = kde(centers)
-        density_norm = density / density.max()
-
-        r_min = self.display_data["Close"].min()
+        r_min = self.view.r_min
         r_max = PRICE_UPPER_BOUND
 
-        color = mcolors.to_rgb(self.theme["low_marker"])
-        bin_width = (grid[1] - grid[0]) * 2 * np.pi
-
-        for center, d in zip(centers, density_norm):
-            if d < KDE_DENSITY_THRESHOLD:
-                continue
-            theta = center * 2 * np.pi
-            self.axes.bar(
-                theta,
-                r_max - r_min,
-                width=bin_width,
-                bottom=r_min,
-                color=color,
-                alpha=d * KDE_MAX_ALPHA,
-                zorder=1,
-                edgecolor="none",
-            )
+        # one bar per bin in a single call, alpha encoded in the colors
+        colors = np.tile(
+            mcolors.to_rgba(self.theme["low_marker"]),
+            (len(self.model.band_density), 1),
+        )
+        colors[:, 3] = self.model.band_density * KDE_MAX_ALPHA
+        self.axes.bar(
+            self.model.band_progress * 2 * np.pi,
+            r_max - r_min,
+            width=self.model.band_width * 2 * np.pi,
+            bottom=r_min,
+            color=colors,
+            zorder=1,
+            edgecolor="none",
+        )
 
     def add_aths(self) -> None:
         """Add all-time high markers to plot."""
-        aths = self.display_data[self.display_data["distance_ath_perc"] == 0]
+        aths = self.view.aths
         self.axes.scatter(
             aths["cycle_progress"] * 2 * np.pi,
             aths["Close"],
@@ -252,7 +185,7 @@ class StaticArtist:
         """Add halving day vertical line."""
         self.axes.vlines(
             0,
-            self.display_data["Close"].min(),
+            self.view.r_min,
             PRICE_UPPER_BOUND,
             color=self.theme["halving_line"],
             linewidth=3,
@@ -265,13 +198,13 @@ class StaticArtist:
             self.display_data["cycle_progress"].to_numpy()[-1] * 2 * np.pi,
             self.display_data["Close"].to_numpy()[-1],
             marker="D",
-            c=self.display_data["color"].to_numpy()[-1],
+            c=self.display_colors[[-1]],
             s=50,
             zorder=8,
         )
         self.axes.vlines(
             self.display_data["cycle_progress"].to_numpy()[-1] * 2 * np.pi,
-            self.display_data["Close"].min(),
+            self.view.r_min,
             self.display_data["Close"].to_numpy()[-1],
             color=self.theme["now_line"],
             linestyle="--",
@@ -289,7 +222,7 @@ class StaticArtist:
                 [],
                 [],
                 marker="D",
-                color=self.display_data["color"].to_numpy()[-1],
+                color=self.display_colors[-1],
                 markersize=7,
                 linestyle="None",
             ),
@@ -314,8 +247,8 @@ class StaticArtist:
             Patch(facecolor=self.theme["low_marker"], alpha=KDE_MAX_ALPHA),
         ]
         labels = [
-            "BTC/USD",
-            "Today BTC/USD Close",
+            self.model.pair,
+            f"Today {self.model.pair} Close",
             "Today",
             "Halving day",
             "All time high (ATH)",
@@ -329,7 +262,9 @@ class StaticArtist:
             loc="upper left",
             bbox_to_anchor=(0.01, 0.97),
             fontsize=10,
-            title="$\\bf{BTCUSD\\ price\\ halving\\ cycles}$",
+            title=r"$\bf{{{}\ price\ halving\ cycles}}$".format(
+                self.model.pair.replace("/", "")
+            ),
             title_fontsize="13",
             frameon=False,
         )
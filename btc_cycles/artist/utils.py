@@ -5,27 +5,56 @@ from typing import TYPE_CHECKING
 
 import matplotlib.colors as mcolors
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
 
 if TYPE_CHECKING:
     from ..core.bitcoin import Bitcoin
 
+MILESTONES = [0.00, 0.25, 0.50, 0.75]
 MILESTONE_NAMES = ["Halving", "25%", "50%", "75%"]
+# a milestone is reached by the first price past it, within this tolerance
+MILESTONE_TOLERANCE = 0.0005
+
+
+def display_start(prices: pd.DataFrame, from_date: str | dt.datetime | None) -> int:
+    """Position of the first price displayed from `from_date` on.
+
+    Prices are sorted by date, so the displayed rows are a trailing
+    slice of the shared frame and need not be copied.
+
+    Args:
+        prices: Price data sorted by date.
+        from_date: Start date for display filtering.
+
+    Returns:
+        Position of the first displayed row.
+    """
+    if from_date is None:
+        return 0
+    return int(np.searchsorted((prices["Date"] >= from_date).to_numpy(), True))
 
 
 class ColorBar:
     """Color bar for distance-from-ATH color mapping.
 
+    Colors are looked up in a table holding every entry of the colormap,
+    so mapping a whole column is a single indexing operation and gives
+    the same colors as calling the colormap per value.
+
     Args:
         bitcoin: Bitcoin object with price data.
 
     Attributes:
         norm: Matplotlib normalizer.
         cmap: Matplotlib colormap.
+        rgba: Lookup table of RGBA colors, the last entry for NaN values.
+        hex: Lookup table of hex colors, aligned with `rgba`.
     """
 
     def __init__(self, bitcoin: "Bitcoin"):
         self._set_cmap(bitcoin)
+        self._set_lut()
 
     def _set_cmap(self, bitcoin: "Bitcoin") -> None:
         """Set colormap and normalization from price data."""
@@ -35,6 +64,26 @@ class ColorBar:
         )
         self.cmap = plt.get_cmap("cool")
 
+    def _set_lut(self) -> None:
+        """Precompute RGBA and hex lookup tables for the colormap."""
+        self.rgba = np.vstack([self.cmap(np.arange(self.cmap.N)), self.cmap.get_bad()])
+        self.hex = np.array([mcolors.to_hex(c) for c in self.rgba])
+
+    def _lut_index(self, values: "pd.Series | np.ndarray") -> np.ndarray:
+        """Lookup table index of each value, quantized like the colormap."""
+        scaled = np.ma.getdata(self.norm(np.asarray(values, dtype=float)))
+        index = np.clip(np.floor(scaled * self.cmap.N), 0, self.cmap.N - 1)
+        index[np.isnan(scaled)] = self.cmap.N
+        return index.astype(np.intp)
+
+    def to_rgba(self, values: "pd.Series | np.ndarray") -> np.ndarray:
+        """Map distances from ATH to an (n, 4) array of RGBA colors."""
+        return self.rgba[self._lut_index(values)]
+
+    def to_hex(self, values: "pd.Series | np.ndarray") -> np.ndarray:
+        """Map distances from ATH to an array of hex colors."""
+        return self.hex[self._lut_index(values)]
+
 
 class ProgressLabels:
     """Progress labels for the polar chart x-axis ticks.
@@ -53,28 +102,42 @@ class ProgressLabels:
 
     def _create_labels(self, bitcoin: "Bitcoin") -> None:
         """Create labels for [0, 0.25, 0.50, 0.75] percent of cycle progress."""
-        self.labels: list[pd.DataFrame] = []
         self._get_moments(bitcoin)
 
     def _get_moments(self, bitcoin: "Bitcoin") -> None:
-        """Get moments for each progress value."""
-        for progress in [0.00, 0.25, 0.50, 0.75]:
-            self.labels.append(
-                bitcoin.prices[
-                    abs((bitcoin.prices["cycle_progress"] - progress)) < 0.0005
-                ]
-                .groupby("cycle_id")
-                .first()
-                .reset_index()
-            )
-        self.labels = pd.concat(self.labels)
-
-        self.labels["cycle_progress"] = self.labels["cycle_progress"].apply(
-            lambda x: round(x, 2)
-        )
-        # keep only the last date per progress milestone
-        self.labels = self.labels.groupby("cycle_progress")["Date"].apply(
-            lambda x: x.dt.strftime("%d-%m-%Y").to_list()[-1]
+        """Get the latest date each progress milestone was reached.
+
+        Cycle boundaries and the first row reaching each milestone are
+        found by binary search, on the sorted cycle ids and on the
+        monotonic progress within each cycle. A milestone passed before
+        the first price of a cycle is looked up in the previous cycle.
+        """
+        prices = bitcoin.prices
+        progress = prices["cycle_progress"].to_numpy(dtype=float)
+        cycle_ids = prices["cycle_id"].to_numpy(dtype=float)
+        cycles = np.sort(bitcoin.halvings["cycle_id"].to_numpy(dtype=float))
+        starts = np.searchsorted(cycle_ids, cycles, side="left")
+        ends = np.searchsorted(cycle_ids, cycles, side="right")
+
+        dates = []
+        for milestone in MILESTONES:
+            date = ""
+            # latest cycle that reached the milestone
+            for start, end in zip(starts[::-1], ends[::-1]):
+                i = start + np.searchsorted(
+                    progress[start:end], milestone - MILESTONE_TOLERANCE, side="right"
+                )
+                # a cycle whose prices start past the milestone did not
+                # reach it within the data
+                if i < end and (
+                    i > start or abs(progress[i] - milestone) <= MILESTONE_TOLERANCE
+                ):
+                    date = prices["Date"].iloc[i].strftime("%d-%m-%Y")
+                    break
+            dates.append(date)
+
+        self.labels = pd.Series(
+            dates, index=pd.Index(MILESTONES, name="cycle_progress"), name="Date"
         )
 
         self._add_predicted(bitcoin)
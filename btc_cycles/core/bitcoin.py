@@ -1,16 +1,73 @@
 """bitcoin module"""
 
+import asyncio
 import datetime
-from typing import TYPE_CHECKING, Literal, Union
+import json
+from concurrent.futures import ThreadPoolExecutor
+from importlib.metadata import version
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Literal, Union
 
-from ..artist import Artist
-from .halvings import Halvings, get_halving_data
+import pandas as pd
+
+from ..instrumentation import stage
+from .halvings import PREDICTION_TTL, Halvings, get_halving_data
 from .prices import Prices
+from .sources import PriceCache, PriceSource, ReplaySource, Source
+from .utils import atomic_write
 
 if TYPE_CHECKING:
     import matplotlib.figure
     import plotly.graph_objects as go
 
+    from ..artist import ChartModel
+
+# schema metadata keys of a saved snapshot
+SNAPSHOT_KEY = b"btc_cycles"
+HALVINGS_KEY = b"btc_cycles.halvings"
+SNAPSHOT_FORMAT = 1
+
+
+def _prediction_options(
+    source: str | PriceSource,
+    cache: PriceCache | str | Path | None,
+    offline: bool,
+    halving_ttl: float,
+) -> dict:
+    """Arguments of get_halving_data matching the price source.
+
+    The prediction is cached alongside the prices. Without a cache, a
+    replay source records or replays it with its prices.
+    """
+    if cache is None and isinstance(source, ReplaySource):
+        replay = source.mode == "replay"
+        return {
+            "cache_dir": source.directory,
+            "ttl": halving_ttl if replay else 0,
+            "offline": offline or replay,
+        }
+    cache_dir = cache.directory if isinstance(cache, PriceCache) else cache
+    return {"cache_dir": cache_dir, "ttl": halving_ttl, "offline": offline}
+
+
+def _client(
+    source: str | PriceSource,
+    api_key: str | None,
+    cache: PriceCache | str | Path | None,
+    offline: bool,
+    granularity: str | None = None,
+) -> PriceSource:
+    """Source to fetch prices with, built from its name if needed."""
+    if isinstance(source, str):
+        return Source(
+            source,
+            api_key,
+            cache=cache,
+            offline=offline,
+            granularity=granularity or "day",
+        )
+    return source
+
 
 class Bitcoin:
     """Bitcoin price data and halving cycle analysis.
@@ -19,11 +76,34 @@ class Bitcoin:
     cycle data, and computes metrics (ATH, cycle progress, cycle lows).
 
     Args:
-        source: Data source. Defaults to "cryptocompare".
+        source: Data source, or the name of one. Defaults to
+            "cryptocompare". A HedgedSource queries several sources,
+            returning the first to answer, a FileSource reads local
+            files and a ReplaySource records or replays another source.
         currency: Currency. Defaults to "USD".
         api_key: API key for the data source.
+        cache: Price cache, or a directory to keep one in. Only prices
+            newer than the cached ones are fetched from the source, and
+            the halving prediction is cached alongside them.
+        offline: Serve prices and the halving prediction from the cache
+            only, without network access.
+        halving_ttl: Seconds a cached halving prediction is used before
+            revalidating it with the API.
+        coin: Coin symbol. Defaults to "BTC". Cycles are always those of
+            the Bitcoin halvings.
+        compact: Store the cycle of each price as a one-byte categorical
+            cycle_id, keeping the per-cycle values (Halving, block,
+            reward, cycle_length) in `halvings` only.
+        price_dtype: Float dtype of the prices and metrics, e.g.
+            "float32" to halve their size.
+        granularity: Period of the prices, "day", "hour" or "minute".
+            Defaults to the granularity of the source, or "day".
+            Intraday prices are plotted at their exact cycle progress.
 
     Attributes:
+        coin: Coin symbol.
+        currency: Currency symbol.
+        granularity: Period of the prices.
         prices: Bitcoin prices with cycle metrics.
         halvings: Bitcoin halving dates and cycle info.
         predicted_halving_date: Predicted next halving date.
@@ -32,25 +112,347 @@ class Bitcoin:
 
     def __init__(
         self,
-        source: str = "cryptocompare",
+        source: str | PriceSource = "cryptocompare",
         currency: str = "USD",
         api_key: str | None = None,
+        cache: PriceCache | str | Path | None = None,
+        offline: bool = False,
+        halving_ttl: float = PREDICTION_TTL,
+        coin: str = "BTC",
+        compact: bool = False,
+        price_dtype: str = "float64",
+        granularity: str | None = None,
     ):
-        # single API call for halving prediction
-        prediction = get_halving_data()
-        self.predicted_halving_date, self.predicted_halving_block = prediction
-
+        client = _client(source, api_key, cache, offline, granularity)
+        # single API call for halving prediction, over the source connections
+        prediction = get_halving_data(
+            **_prediction_options(source, cache, offline, halving_ttl),
+            session=getattr(client, "session", None),
+        )
         # single Halvings instantiation, reused for prices
-        halvings = Halvings(prediction=prediction)
-        self.halvings = halvings.data
+        halvings = Halvings(prediction=prediction).data
 
         # get processed price data
-        self.prices = Prices(
+        prices = Prices(
             currency=currency,
-            source=source,
+            source=client,
             api_key=api_key,
-            halvings=halvings.data,
-        ).data
+            halvings=halvings,
+            cache=cache,
+            offline=offline,
+            coin=coin,
+            compact=compact,
+            price_dtype=price_dtype,
+            granularity=granularity,
+        )
+        self._setup(prediction, halvings, prices)
+
+    @classmethod
+    async def acreate(
+        cls,
+        source: str | PriceSource = "cryptocompare",
+        currency: str = "USD",
+        api_key: str | None = None,
+        cache: PriceCache | str | Path | None = None,
+        offline: bool = False,
+        halving_ttl: float = PREDICTION_TTL,
+        coin: str = "BTC",
+        compact: bool = False,
+        price_dtype: str = "float64",
+        granularity: str | None = None,
+    ) -> "Bitcoin":
+        """Build a Bitcoin snapshot without blocking the event loop.
+
+        The halving prediction and the prices are fetched concurrently,
+        and the metrics are computed in a worker thread. Takes the same
+        arguments as the constructor.
+
+        Example:
+            >>> btc = await Bitcoin.acreate(api_key="YOUR_API_KEY")
+
+        Returns:
+            The Bitcoin snapshot.
+        """
+        client = _client(source, api_key, cache, offline, granularity)
+        prediction, data = await asyncio.gather(
+            asyncio.to_thread(
+                get_halving_data,
+                **_prediction_options(source, cache, offline, halving_ttl),
+                session=getattr(client, "session", None),
+            ),
+            client.aget_data(coin, currency),
+        )
+        return await asyncio.to_thread(
+            cls._from_data,
+            prediction,
+            Halvings(prediction=prediction).data,
+            data,
+            coin,
+            currency,
+            source,
+            compact,
+            price_dtype,
+            granularity,
+        )
+
+    @classmethod
+    def batch(
+        cls,
+        pairs: Iterable[tuple[str, str]],
+        source: str | PriceSource = "cryptocompare",
+        api_key: str | None = None,
+        cache: PriceCache | str | Path | None = None,
+        offline: bool = False,
+        halving_ttl: float = PREDICTION_TTL,
+        max_workers: int | None = None,
+        compact: bool = False,
+        price_dtype: str = "float64",
+        granularity: str | None = None,
+    ) -> dict[tuple[str, str], "Bitcoin"]:
+        """Build snapshots of several coin/currency pairs at once.
+
+        The halving prediction is fetched and the halving table built
+        once for all pairs. The prices of every pair are fetched
+        concurrently through a single source client, whose connections
+        the prediction request reuses.
+
+        Example:
+            >>> charts = Bitcoin.batch([("BTC", "USD"), ("BTC", "EUR")])
+            >>> charts["BTC", "EUR"].plot()
+
+        Args:
+            pairs: (coin, currency) pairs, e.g. ("BTC", "EUR").
+            source: Data source, or the name of one. Defaults to
+                "cryptocompare".
+            api_key: API key for the data source.
+            cache: Price cache, or a directory to keep one in.
+            offline: Serve prices and the halving prediction from the
+                cache only, without network access.
+            halving_ttl: Seconds a cached halving prediction is used
+                before revalidating it with the API.
+            max_workers: Maximum concurrent fetches. Defaults to one
+                per request.
+            compact: Use the compact layout of the prices.
+            price_dtype: Float dtype of the prices and metrics.
+            granularity: Period of the prices, "day", "hour" or "minute".
+
+        Returns:
+            Snapshots keyed by (coin, currency) pair, in the given order.
+        """
+        pairs = list(dict.fromkeys(pairs))
+        client = _client(source, api_key, cache, offline, granularity)
+
+        with ThreadPoolExecutor(max_workers=max_workers or len(pairs) + 1) as pool:
+            prediction_future = pool.submit(
+                get_halving_data,
+                **_prediction_options(source, cache, offline, halving_ttl),
+                session=getattr(client, "session", None),
+            )
+            data_futures = [pool.submit(client.get_data, *pair) for pair in pairs]
+            prediction = prediction_future.result()
+            halvings = Halvings(prediction=prediction).data
+            return {
+                pair: cls._from_data(
+                    prediction,
+                    halvings,
+                    future.result(),
+                    *pair,
+                    source,
+                    compact,
+                    price_dtype,
+                    granularity,
+                )
+                for pair, future in zip(pairs, data_futures)
+            }
+
+    @classmethod
+    def _from_data(
+        cls,
+        prediction: tuple[datetime.datetime, int],
+        halvings: pd.DataFrame,
+        data: pd.DataFrame,
+        coin: str,
+        currency: str,
+        source: str | PriceSource,
+        compact: bool,
+        price_dtype: str,
+        granularity: str | None,
+    ) -> "Bitcoin":
+        """Build a snapshot from prices already fetched from the source."""
+        bitcoin = cls.__new__(cls)
+        prices = Prices(
+            currency=currency,
+            source=source,
+            api_key=None,
+            halvings=halvings,
+            data=data,
+            coin=coin,
+            compact=compact,
+            price_dtype=price_dtype,
+            granularity=granularity or getattr(source, "granularity", None),
+        )
+        bitcoin._setup(prediction, halvings, prices)
+        return bitcoin
+
+    def _setup(
+        self,
+        prediction: tuple[datetime.datetime, int],
+        halvings: pd.DataFrame,
+        prices: Prices,
+    ) -> None:
+        """Set the halving prediction, halvings and processed prices."""
+        self.predicted_halving_date, self.predicted_halving_block = prediction
+        self.halvings = halvings
+        self.coin = prices.coin
+        self.currency = prices.currency
+        self.granularity = prices.granularity
+        self._prices = prices
+        self.prices = prices.data
+        self._chart_model: "ChartModel | None" = None
+
+    @property
+    def chart_model(self) -> "ChartModel":
+        """Render model shared by every plot of this snapshot.
+
+        Built on first use and rebuilt after the prices are updated or
+        replaced.
+        """
+        # plotting dependencies are only imported when rendering
+        from ..artist import ChartModel
+
+        if self._chart_model is None or self._chart_model.prices is not self.prices:
+            self._chart_model = ChartModel(self)
+        return self._chart_model
+
+    def update(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Append new candles, extending the metrics incrementally.
+
+        Args:
+            data: New candles with Date and Close columns, with the same
+                schema as returned by the source. A candle dated on the
+                last known date replaces it.
+
+        Returns:
+            Updated prices with cycle metrics.
+        """
+        with stage("update", rows=len(data)):
+            self.prices = self._prices.update(data)
+        self._chart_model = None
+        return self.prices
+
+    def save(self, path: str | Path) -> None:
+        """Save the snapshot to an Arrow IPC file.
+
+        The prices are stored as the columns of the file, the halvings
+        and the prediction in its metadata, along with the coin, currency,
+        source and layout of the prices. Nothing needs to be fetched or
+        recomputed to load it back.
+
+        Example:
+            >>> btc.save("btc-usd.arrow")
+            >>> btc = Bitcoin.load("btc-usd.arrow")
+
+        Args:
+            path: Path of the file. Replaced if it exists.
+        """
+        import pyarrow as pa
+
+        halvings = pa.Table.from_pandas(self.halvings, preserve_index=False)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, halvings.schema) as writer:
+            writer.write_table(halvings)
+
+        metadata = {
+            "format": SNAPSHOT_FORMAT,
+            "version": version("btc-cycles"),
+            "saved_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "coin": self.coin,
+            "currency": self.currency,
+            "source": self._prices.source,
+            "granularity": self.granularity,
+            "compact": self._prices.compact,
+            "price_dtype": self._prices.price_dtype,
+            "rows": len(self.prices),
+            "predicted_halving_date": self.predicted_halving_date.isoformat(),
+            "predicted_halving_block": int(self.predicted_halving_block),
+            # dtypes Arrow does not round trip, e.g. the object rewards
+            "halvings_dtypes": {
+                column: str(dtype) for column, dtype in self.halvings.dtypes.items()
+            },
+        }
+        table = pa.Table.from_pandas(self.prices, preserve_index=False)
+        table = table.replace_schema_metadata(
+            {
+                **table.schema.metadata,
+                SNAPSHOT_KEY: json.dumps(metadata),
+                HALVINGS_KEY: sink.getvalue().to_pybytes(),
+            }
+        )
+
+        with (
+            atomic_write(Path(path).expanduser()) as tmp,
+            pa.OSFile(str(tmp), "wb") as file,
+            pa.ipc.new_file(file, table.schema) as writer,
+        ):
+            writer.write_table(table)
+
+    @classmethod
+    def load(cls, path: str | Path, memory_map: bool = True) -> "Bitcoin":
+        """Load a snapshot saved with `save`.
+
+        The file is memory-mapped, so the price columns are read-only
+        views of its pages, shared by every process loading it, rather
+        than copies. Updating the prices still works, creating new columns.
+
+        Args:
+            path: Path of the file.
+            memory_map: Map the file instead of reading it into memory.
+
+        Returns:
+            The Bitcoin snapshot.
+
+        Raises:
+            ValueError: If the file is not a saved snapshot.
+        """
+        import pyarrow as pa
+
+        path = str(Path(path).expanduser())
+        source = pa.memory_map(path) if memory_map else pa.OSFile(path)
+        with source:
+            table = pa.ipc.open_file(source).read_all()
+        schema_metadata = table.schema.metadata or {}
+        if SNAPSHOT_KEY not in schema_metadata:
+            raise ValueError(f"'{path}' is not a saved Bitcoin snapshot")
+        metadata = json.loads(schema_metadata[SNAPSHOT_KEY])
+        if metadata["format"] > SNAPSHOT_FORMAT:
+            raise ValueError(
+                f"snapshot format {metadata['format']} is newer than supported"
+            )
+
+        halvings = (
+            pa.ipc.open_stream(schema_metadata[HALVINGS_KEY])
+            .read_all()
+            .to_pandas()
+            .astype(metadata["halvings_dtypes"])
+        )
+        prices = Prices._restore(
+            # keep the columns apart, so they are not copied into blocks
+            data=table.to_pandas(split_blocks=True),
+            halvings=halvings,
+            coin=metadata["coin"],
+            currency=metadata["currency"],
+            source=metadata["source"],
+            compact=metadata["compact"],
+            price_dtype=metadata["price_dtype"],
+            granularity=metadata["granularity"],
+        )
+        prediction = (
+            datetime.datetime.fromisoformat(metadata["predicted_halving_date"]),
+            metadata["predicted_halving_block"],
+        )
+        bitcoin = cls.__new__(cls)
+        bitcoin._setup(prediction, halvings, prices)
+        return bitcoin
 
     def plot(
         self,
@@ -71,4 +473,8 @@ class Bitcoin:
         Returns:
             A matplotlib Figure (static) or Plotly Figure (interactive).
         """
-        return Artist(bitcoin=self, kind=kind, theme=theme).plot(from_date=from_date)
+        from ..artist import Artist
+
+        return Artist(
+            bitcoin=self, kind=kind, theme=theme, model=self.chart_model
+        ).plot(from_date=from_date)
@@ -2,43 +2,145 @@
 
 import datetime
 import json
+import time
+import warnings
 from pathlib import Path
 
 import pandas as pd
 import requests
 
+from ..instrumentation import stage
+from .utils import atomic_write
+
 URL = "https://api.watcher.guru/bitcoinhalving/predictions"
 REQUEST_TIMEOUT = 10
+# seconds a cached prediction is used before revalidating it
+PREDICTION_TTL = 6 * 60 * 60
+CACHE_FILE = "halving_prediction.json"
 
 
 class HalvingAPIError(Exception):
     """Raised when the halving prediction API is unreachable or returns invalid data."""
 
 
-def get_halving_data() -> tuple[datetime.datetime, int]:
+def get_halving_data(
+    cache_dir: str | Path | None = None,
+    ttl: float = PREDICTION_TTL,
+    offline: bool = False,
+    timeout: float = REQUEST_TIMEOUT,
+    session: requests.Session | None = None,
+) -> tuple[datetime.datetime, int]:
     """Get next halving data from the watcher.guru API.
 
+    When a cache directory is given, the last good prediction is kept
+    there. It is returned as-is while younger than `ttl`, then
+    revalidated with ETag/If-Modified-Since, and used as a fallback if
+    the API is slow, down or returns unexpected data.
+
+    Args:
+        cache_dir: Directory where the prediction is cached.
+        ttl: Seconds a cached prediction is used without revalidation.
+        offline: Return the cached prediction without network access.
+        timeout: Request timeout in seconds.
+        session: HTTP session to send the request with, e.g. to reuse
+            its connections. A one-off connection is used if None.
+
     Returns:
         Predicted halving date and block number.
 
     Raises:
-        HalvingAPIError: If the API request fails or returns unexpected data.
+        HalvingAPIError: If the API request fails or returns unexpected
+            data and no cached prediction is available.
     """
+    path = None if cache_dir is None else Path(cache_dir).expanduser() / CACHE_FILE
+    cached = _load_cached_prediction(path)
+
+    if cached is not None and (offline or time.time() - cached["fetched_at"] < ttl):
+        return _cached_prediction(cached)
+    if offline:
+        raise HalvingAPIError("No cached halving prediction available offline")
+
+    headers = {}
+    if cached is not None:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    try:
+        response = _request_prediction(headers, timeout, session)
+        if cached is not None and response.status_code == 304:
+            cached["fetched_at"] = time.time()
+            _save_cached_prediction(path, cached)
+            return _cached_prediction(cached)
+        timestamp, block = _parse_prediction(response)
+    except HalvingAPIError as e:
+        if cached is None:
+            raise
+        warnings.warn(f"{e}. Using cached halving prediction.", stacklevel=2)
+        return _cached_prediction(cached)
+
+    record = {"timestamp": timestamp, "block": block}
+    if path is not None:
+        record["etag"] = response.headers.get("ETag")
+        record["last_modified"] = response.headers.get("Last-Modified")
+        record["fetched_at"] = time.time()
+        _save_cached_prediction(path, record)
+    return _cached_prediction(record)
+
+
+def _request_prediction(
+    headers: dict[str, str], timeout: float, session: requests.Session | None
+) -> requests.Response:
+    """Send the prediction request, raising HalvingAPIError on failure."""
+    client = requests if session is None else session
+    try:
+        with stage("halving_api") as record:
+            response = client.get(URL, timeout=timeout, headers=headers)
+            record.bytes = len(response.content)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        raise HalvingAPIError(f"Failed to fetch halving data: {e}") from e
+    return response
+
+
+def _parse_prediction(response: requests.Response) -> tuple[float, int]:
+    """Extract the predicted timestamp and block number from a response."""
     try:
-        response = requests.get(URL, timeout=REQUEST_TIMEOUT).json()
-    except (requests.RequestException, ValueError) as e:
+        payload = response.json()
+    except ValueError as e:
         raise HalvingAPIError(f"Failed to fetch halving data: {e}") from e
 
     try:
-        date = datetime.datetime.fromtimestamp(
-            response["target"]["predicted_timestamp"]
-        )
-        date = date.replace(tzinfo=datetime.timezone.utc)
-        block = int(response["target"]["block_number"])
+        timestamp = payload["target"]["predicted_timestamp"]
+        datetime.datetime.fromtimestamp(timestamp)
+        block = int(payload["target"]["block_number"])
     except (KeyError, TypeError, ValueError) as e:
         raise HalvingAPIError(f"Unexpected API response format: {e}") from e
+    return timestamp, block
+
+
+def _load_cached_prediction(path: Path | None) -> dict | None:
+    """Load a cached prediction record, ignoring unreadable files."""
+    if path is None or not path.exists():
+        return None
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_cached_prediction(path: Path, record: dict) -> None:
+    """Store a prediction record, writing then renaming the file."""
+    with atomic_write(path) as tmp, open(tmp, "w") as f:
+        json.dump(record, f)
+
 
-    return date, block
+def _cached_prediction(record: dict) -> tuple[datetime.datetime, int]:
+    """Build the prediction tuple from a prediction record."""
+    date = datetime.datetime.fromtimestamp(record["timestamp"])
+    return date.replace(tzinfo=datetime.timezone.utc), int(record["block"])
 
 
 def _update_predicted_halving_date(
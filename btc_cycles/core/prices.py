@@ -1,8 +1,89 @@
 """prices module"""
 
+from pathlib import Path
+
+import numpy as np
 import pandas as pd
 
-from .sources import Source
+from ..instrumentation import stage
+from .sources import GRANULARITIES, PriceCache, PriceSource, Source
+
+# per-cycle columns copied from the halvings onto every price row
+CYCLE_COLUMNS = ["block", "reward", "cycle_length", "cycle_id"]
+# minimum days between two lows of a cycle to consider them distinct
+CYCLE_LOW_SEPARATION_DAYS = 90
+
+
+def _assign_cycles(
+    dates: pd.Series, halvings: pd.DataFrame, compact: bool = False
+) -> dict:
+    """Attach dates to the halving cycle they fall in.
+
+    Each date belongs to the latest halving on or before it, found by
+    binary search of the sorted halving dates.
+
+    Args:
+        dates: Dates to assign, in UTC.
+        halvings: Halving data with "Date" and cycle columns.
+        compact: Only return a categorical cycle_id, whose codes are
+            the positions of the cycles in `halvings`.
+
+    Returns:
+        Cycle columns (block, reward, cycle_length, cycle_id, Halving)
+        aligned with `dates`; NaN before the first halving.
+    """
+    known = halvings[halvings["Date"].notna()]
+    positions = known["Date"].searchsorted(dates, side="right") - 1
+    before = positions < 0
+
+    if compact:
+        codes = np.flatnonzero(halvings["Date"].notna())[positions]
+        codes[before] = -1
+        return {
+            "cycle_id": pd.Categorical.from_codes(
+                codes, categories=pd.Index(halvings["cycle_id"].to_numpy())
+            )
+        }
+
+    columns = {}
+    for column in CYCLE_COLUMNS:
+        values = known[column].to_numpy(dtype=float)[positions]
+        values[before] = np.nan
+        columns[column] = values
+    columns["Halving"] = known["Date"].array.take(positions, allow_fill=True)
+    return columns
+
+
+def _fmt_prices(
+    data: pd.DataFrame,
+    halvings: pd.DataFrame,
+    compact: bool = False,
+    price_dtype: str = "float64",
+) -> pd.DataFrame:
+    """Format source prices and attach each price to its halving cycle.
+
+    Args:
+        data: Prices with Date and Close columns, as returned by the source.
+        halvings: Halving data.
+        compact: Only attach a categorical cycle_id referencing `halvings`.
+        price_dtype: Float dtype of the prices.
+
+    Returns:
+        Prices sorted by date, with UTC dates and cycle columns.
+    """
+    data = data.assign(
+        Date=pd.to_datetime(data["Date"]).dt.tz_localize("UTC"),
+        Close=data["Close"].astype(price_dtype),
+    )
+    # drop missing closes, ATH calculation requires ascending dates
+    data = data[data["Close"].notna()]
+    if not data["Date"].is_monotonic_increasing:
+        data = data.sort_values("Date")
+    data = data.reset_index(drop=True)
+
+    for column, values in _assign_cycles(data["Date"], halvings, compact).items():
+        data[column] = values
+    return data
 
 
 def _find_ath(dataframe: pd.DataFrame) -> pd.DataFrame:
@@ -21,8 +102,67 @@ def _find_ath(dataframe: pd.DataFrame) -> pd.DataFrame:
     return dataframe
 
 
+def _segment_argmin(
+    values: np.ndarray, starts: np.ndarray, segments: np.ndarray
+) -> np.ndarray:
+    """Position of the first minimum of each contiguous segment.
+
+    Args:
+        values: Values to minimize, without NaNs.
+        starts: Start position of each segment.
+        segments: Segment index of each value.
+
+    Returns:
+        One position per segment.
+    """
+    minima = np.minimum.reduceat(values, starts)
+    hits = np.flatnonzero(values == minima[segments])
+    hit_segments = segments[hits]
+    return hits[np.r_[True, hit_segments[1:] != hit_segments[:-1]]]
+
+
+def _segment_lows(
+    distance: np.ndarray,
+    dates: np.ndarray,
+    cycle_ids: np.ndarray,
+    min_separation_days: int,
+) -> np.ndarray:
+    """Positions of the cycle lows of chronologically ordered rows.
+
+    Args:
+        distance: Distance from ATH of each row.
+        dates: Date of each row, as datetime64.
+        cycle_ids: Cycle of each row; each cycle must be contiguous.
+        min_separation_days: Minimum days between two lows
+            to consider them distinct.
+
+    Returns:
+        Sorted positions of the first and second lows of every cycle.
+    """
+    if len(distance) == 0:
+        return np.empty(0, dtype=np.intp)
+
+    boundaries = np.r_[True, cycle_ids[1:] != cycle_ids[:-1]]
+    starts = np.flatnonzero(boundaries)
+    segments = np.cumsum(boundaries) - 1
+    values = np.where(np.isnan(distance), np.inf, distance)
+
+    # first low: deepest drawdown
+    first = _segment_argmin(values, starts, segments)
+
+    # second low: deepest drawdown at least min_separation_days away
+    days = (dates - dates[first][segments]) // np.timedelta64(1, "D")
+    distant = np.where(np.abs(days) >= min_separation_days, values, np.inf)
+    second = _segment_argmin(distant, starts, segments)
+
+    # drop segments without any (distant) value
+    first = first[np.isfinite(values[first])]
+    second = second[np.isfinite(distant[second])]
+    return np.union1d(first, second)
+
+
 def _find_cycle_lows(
-    dataframe: pd.DataFrame, min_separation_days: int = 90
+    dataframe: pd.DataFrame, min_separation_days: int = CYCLE_LOW_SEPARATION_DAYS
 ) -> pd.DataFrame:
     """Find significant drawdown lows in each completed cycle.
 
@@ -31,6 +171,8 @@ def _find_cycle_lows(
     `min_separation_days` from the first.
 
     Excludes the last (ongoing) cycle since the true bottom is unknown.
+    Rows must be in chronological order, so that every cycle is a
+    contiguous segment.
 
     Args:
         dataframe: Historical OHLC data with
@@ -41,41 +183,55 @@ def _find_cycle_lows(
     Returns:
         Data with "is_cycle_low" column added.
     """
-    dataframe["is_cycle_low"] = False
-    last_cycle = dataframe["cycle_id"].max()
+    is_cycle_low = np.zeros(len(dataframe), dtype=bool)
+    cycle_ids = dataframe["cycle_id"].to_numpy(dtype=float)
 
-    for _, cycle_df in dataframe[dataframe["cycle_id"] < last_cycle].groupby(
-        "cycle_id"
-    ):
-        # first low: deepest drawdown
-        first_low_idx = cycle_df["distance_ath_perc"].idxmin()
-        dataframe.loc[first_low_idx, "is_cycle_low"] = True
-
-        # second low: deepest drawdown at least min_separation_days away
-        first_low_date = dataframe.loc[first_low_idx, "Date"]
-        distant = cycle_df[
-            (cycle_df["Date"] - first_low_date).dt.days.abs() >= min_separation_days
-        ]
-        if not distant.empty:
-            second_low_idx = distant["distance_ath_perc"].idxmin()
-            dataframe.loc[second_low_idx, "is_cycle_low"] = True
+    completed = np.flatnonzero(cycle_ids < np.nanmax(cycle_ids, initial=-np.inf))
+    lows = _segment_lows(
+        dataframe["distance_ath_perc"].to_numpy(dtype=float)[completed],
+        dataframe["Date"].to_numpy(dtype="datetime64[ns]")[completed],
+        cycle_ids[completed],
+        min_separation_days,
+    )
+    is_cycle_low[completed[lows]] = True
 
+    dataframe["is_cycle_low"] = is_cycle_low
     return dataframe
 
 
-def _find_cycle_progress(dataframe: pd.DataFrame) -> pd.DataFrame:
+def _find_cycle_progress(
+    dataframe: pd.DataFrame,
+    halvings: pd.DataFrame | None = None,
+    unit: pd.Timedelta = pd.Timedelta(days=1),
+) -> pd.DataFrame:
     """Find cycle progress as fraction of cycle length.
 
+    The time elapsed since the halving is counted in whole periods of
+    the prices, so daily prices progress by whole days and hourly ones
+    by whole hours, while cycle lengths are always in days.
+
     Args:
-        dataframe: Historical OHLC data with
-            "cycle" and "cycle_length" columns.
+        dataframe: Historical OHLC data with "Halving" and "cycle_length"
+            columns, or with a compact cycle_id.
+        halvings: Halving data a compact cycle_id refers to.
+        unit: Period of the prices.
 
     Returns:
         Data with "cycle_progress" column added.
     """
-    dataframe["cycle_progress"] = (
-        (dataframe["Date"] - dataframe["Halving"]).dt.days
-    ) / dataframe["cycle_length"]
+    if "Halving" in dataframe:
+        halving = dataframe["Halving"]
+        cycle_length = dataframe["cycle_length"]
+    else:
+        codes = dataframe["cycle_id"].cat.codes.to_numpy()
+        halving = pd.Series(
+            halvings["Date"].array.take(codes, allow_fill=True), index=dataframe.index
+        )
+        cycle_length = np.where(
+            codes < 0, np.nan, halvings["cycle_length"].to_numpy(dtype=float)[codes]
+        )
+    elapsed = (dataframe["Date"] - halving) // unit * (unit / pd.Timedelta(days=1))
+    dataframe["cycle_progress"] = elapsed / cycle_length
     return dataframe
 
 
@@ -87,51 +243,174 @@ class Prices:
 
     Args:
         currency: Currency symbol (e.g. "USD").
-        source: Data source name.
-        api_key: API key for the source.
+        source: Data source, or the name of one.
+        api_key: API key for the source, if built from its name.
         halvings: Pre-built halving data to avoid redundant API calls.
+        cache: Price cache, or a directory to keep one in.
+        offline: Serve prices from the cache only.
+        data: Prices already fetched from the source, with Date and
+            Close columns. Fetched if None.
+        coin: Coin symbol. Defaults to "BTC". Cycles are always those
+            of the Bitcoin halvings.
+        compact: Store the cycle of each price as a categorical cycle_id
+            (one byte per row) referencing the halvings, which hold the
+            per-cycle values, instead of repeating the Halving, block,
+            reward and cycle_length columns on every row.
+        price_dtype: Float dtype of the prices and metrics, e.g.
+            "float32" to halve their size.
+        granularity: Period of the prices, "day", "hour" or "minute".
+            Defaults to the granularity of the source, or "day".
 
     Attributes:
         data: Processed historical OHLC data with metrics.
+        coin: Coin symbol.
+        currency: Currency symbol.
+        granularity: Period of the prices.
+        source: Name of the data source, if known.
     """
 
-    coin: str = "BTC"
-
     def __init__(
         self,
         currency: str,
-        source: str,
+        source: str | PriceSource,
         api_key: str | None,
         halvings: pd.DataFrame,
+        cache: PriceCache | str | Path | None = None,
+        offline: bool = False,
+        data: pd.DataFrame | None = None,
+        coin: str = "BTC",
+        compact: bool = False,
+        price_dtype: str = "float64",
+        granularity: str | None = None,
     ):
-        self.data = Source(source, api_key).get_data(self.coin, currency)
+        self.coin = coin
+        self.currency = currency
+        self.compact = compact
+        self.price_dtype = price_dtype
+        if granularity is None:
+            granularity = getattr(source, "granularity", "day")
+        self.granularity = granularity
+        self.source = (
+            source if isinstance(source, str) else getattr(source, "source", None)
+        )
+        if data is None:
+            if isinstance(source, str):
+                source = Source(
+                    source,
+                    api_key,
+                    cache=cache,
+                    offline=offline,
+                    granularity=granularity,
+                )
+            data = source.get_data(coin, currency)
+        self.data = data
         self.halvings = halvings
         self._fmt_df()
         self._set_metrics()
 
+    @classmethod
+    def _restore(
+        cls,
+        data: pd.DataFrame,
+        halvings: pd.DataFrame,
+        coin: str,
+        currency: str,
+        source: str | None,
+        compact: bool,
+        price_dtype: str,
+        granularity: str,
+    ) -> "Prices":
+        """Prices whose metrics were already computed, e.g. by a saved snapshot."""
+        prices = cls.__new__(cls)
+        prices.coin = coin
+        prices.currency = currency
+        prices.source = source
+        prices.compact = compact
+        prices.price_dtype = price_dtype
+        prices.granularity = granularity
+        prices.data = data
+        prices.halvings = halvings
+        return prices
+
+    @property
+    def _unit(self) -> pd.Timedelta:
+        """Period of the prices."""
+        return pd.Timedelta(GRANULARITIES[self.granularity][0])
+
     def _fmt_df(self) -> None:
-        """Format DataFrame by merging with halvings and forward-filling."""
-        self.data["Date"] = pd.to_datetime(self.data["Date"]).dt.tz_localize("UTC")
-
-        halvings = self.halvings.copy()
-        halvings["Halving"] = halvings["Date"]
-        self.data = self.data.merge(
-            halvings,
-            how="outer",
-            on="Date",
-        )
-        self.data[["block", "cycle_length", "cycle_id", "Halving", "reward"]] = (
-            self.data[["block", "cycle_length", "cycle_id", "Halving", "reward"]]
-            .infer_objects()
-            .ffill()
-        )
-        # remove halvings outside of price data range
-        self.data = self.data[self.data["Close"].notna()]
-        # sort by date (ATH calculation requires ascending order)
-        self.data = self.data.sort_values("Date").reset_index(drop=True)
+        """Format DataFrame and attach each price to its halving cycle."""
+        with stage("format", rows=len(self.data)):
+            self.data = _fmt_prices(
+                self.data, self.halvings, self.compact, self.price_dtype
+            )
 
     def _set_metrics(self) -> None:
         """Set ATH, cycle lows, and cycle progress metrics."""
-        self.data = _find_ath(self.data)
-        self.data = _find_cycle_lows(self.data)
-        self.data = _find_cycle_progress(self.data)
+        with stage("metrics", rows=len(self.data)):
+            self.data = _find_ath(self.data)
+            self.data = _find_cycle_lows(self.data)
+            self.data = _find_cycle_progress(self.data, self.halvings, self._unit)
+            self.data["cycle_progress"] = self.data["cycle_progress"].astype(
+                self.price_dtype
+            )
+
+    def update(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Append new candles and extend the metrics incrementally.
+
+        Only the new rows are processed: the running ATH and the current
+        cycle are carried over from the last known row. Cycle lows are
+        re-evaluated only for the cycles closed by the new rows.
+
+        A candle dated on the last known date replaces it, so a partial
+        candle can be updated in place.
+
+        Args:
+            data: New candles with Date and Close columns, with the same
+                schema as returned by the source.
+
+        Returns:
+            Updated data with metrics.
+
+        Raises:
+            ValueError: If a candle is older than the last known date.
+        """
+        new = _fmt_prices(data, self.halvings, self.compact, self.price_dtype)
+        if new.empty:
+            return self.data
+        if self.data.empty:
+            self.data = new
+            self._set_metrics()
+            return self.data
+
+        if new["Date"].iat[0] < self.data["Date"].iat[-1]:
+            raise ValueError("cannot update prices before the last known date")
+        # positions from `start` on are replaced by the new candles
+        start = int(self.data["Date"].searchsorted(new["Date"].iat[0]))
+
+        ath = self.data["ATH"].iat[start - 1] if start > 0 else -np.inf
+        new["ATH"] = np.maximum.accumulate(np.r_[ath, new["Close"].to_numpy()])[1:]
+        new["distance_ath_perc"] = (new["Close"] - new["ATH"]) / new["ATH"]
+        new["is_cycle_low"] = False
+        new = _find_cycle_progress(new, self.halvings, self._unit)
+
+        current_cycle = self.data["cycle_id"].iat[-1]
+        self.data = pd.concat(
+            [self.data.iloc[:start], new[self.data.columns].astype(self.data.dtypes)],
+            ignore_index=True,
+        )
+
+        if new["cycle_id"].iat[-1] > current_cycle:
+            self._set_closed_cycle_lows(current_cycle)
+        return self.data
+
+    def _set_closed_cycle_lows(self, cycle_id: float) -> None:
+        """Set lows of the cycles from `cycle_id` up to the ongoing one."""
+        cycle_ids = self.data["cycle_id"].to_numpy(dtype=float)
+        lo, hi = np.searchsorted(cycle_ids, [cycle_id, cycle_ids[-1]])
+        lows = _segment_lows(
+            self.data["distance_ath_perc"].to_numpy(dtype=float)[lo:hi],
+            self.data["Date"].to_numpy(dtype="datetime64[ns]")[lo:hi],
+            cycle_ids[lo:hi],
+            CYCLE_LOW_SEPARATION_DAYS,
+        )
+        self.data.loc[lo + lows, "is_cycle_low"] = True
@@ -1,5 +1,25 @@
 """sources module"""
 
-from .source import DataSourceError, Source
+from typing import Union
 
-__all__ = ["DataSourceError", "Source"]
+from .cache import PriceCache
+from .composite import HedgedSource, SourceStats
+from .file import FileSource, ReplaySource
+from .source import GRANULARITIES, DataSourceError, Source
+from .store import PriceStore
+
+# anything prices can be fetched from
+PriceSource = Union[Source, HedgedSource, FileSource, ReplaySource]
+
+__all__ = [
+    "GRANULARITIES",
+    "DataSourceError",
+    "FileSource",
+    "HedgedSource",
+    "PriceCache",
+    "PriceSource",
+    "PriceStore",
+    "ReplaySource",
+    "Source",
+    "SourceStats",
+]
@@ -0,0 +1,103 @@
+"""price cache module"""
+
+from pathlib import Path
+
+import pandas as pd
+
+from ..utils import atomic_write
+
+
+class PriceCache:
+    """On-disk columnar cache of historical prices.
+
+    One Parquet file is kept per (source, coin, fiat) key, holding the
+    Date and Close columns as returned by the source.
+
+    Args:
+        directory: Directory where the cache files are stored.
+            Created on first write.
+    """
+
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory).expanduser()
+
+    def path(self, source: str, coin: str, fiat: str) -> Path:
+        """Path of the cache file for a key.
+
+        Args:
+            source: Data source name.
+            coin: Coin symbol (e.g. "BTC").
+            fiat: Currency symbol (e.g. "USD").
+
+        Returns:
+            Path of the Parquet file.
+        """
+        return self.directory / f"{source}-{coin}-{fiat}.parquet".lower()
+
+    def load(self, source: str, coin: str, fiat: str) -> pd.DataFrame | None:
+        """Load cached prices for a key.
+
+        Args:
+            source: Data source name.
+            coin: Coin symbol (e.g. "BTC").
+            fiat: Currency symbol (e.g. "USD").
+
+        Returns:
+            Cached prices sorted by date, or None if nothing is cached.
+        """
+        path = self.path(source, coin, fiat)
+        if not path.exists():
+            return None
+        return pd.read_parquet(path)
+
+    def save(self, source: str, coin: str, fiat: str, data: pd.DataFrame) -> None:
+        """Store prices for a key, replacing what was cached.
+
+        Args:
+            source: Data source name.
+            coin: Coin symbol (e.g. "BTC").
+            fiat: Currency symbol (e.g. "USD").
+            data: Prices with Date and Close columns.
+        """
+        with atomic_write(self.path(source, coin, fiat)) as tmp:
+            data[["Date", "Close"]].to_parquet(tmp, index=False)
+
+    def update(
+        self,
+        source: str,
+        coin: str,
+        fiat: str,
+        cached: pd.DataFrame | None,
+        fetched: pd.DataFrame,
+    ) -> pd.DataFrame:
+        """Merge freshly fetched prices into the cached ones and store them.
+
+        Fetched rows take precedence over cached rows with the same date,
+        so a partial candle cached earlier in the day gets replaced.
+
+        Args:
+            source: Data source name.
+            coin: Coin symbol (e.g. "BTC").
+            fiat: Currency symbol (e.g. "USD").
+            cached: Previously cached prices, if any.
+            fetched: Prices fetched from the source.
+
+        Returns:
+            Merged prices sorted by date.
+        """
+        if cached is None or cached.empty:
+            data = fetched[["Date", "Close"]]
+        elif fetched.empty:
+            return cached
+        else:
+            data = pd.concat(
+                [cached[cached["Date"] < fetched["Date"].min()], fetched],
+                ignore_index=True,
+            )[["Date", "Close"]]
+        data = (
+            data.drop_duplicates("Date", keep="last")
+            .sort_values("Date")
+            .reset_index(drop=True)
+        )
+        self.save(source, coin, fiat, data)
+        return data
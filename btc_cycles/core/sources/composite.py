@@ -0,0 +1,212 @@
+"""composite sources"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Sequence, Union
+
+import pandas as pd
+
+from .source import DataSourceError, Source
+
+# seconds to wait for a source before also querying the next one
+HEDGE_DELAY = 2.0
+# weight of the latest call in the smoothed latency
+LATENCY_SMOOTHING = 0.3
+# seconds after which the statistics of a source are re-measured
+PROBE_INTERVAL = 300.0
+
+
+@dataclass
+class SourceStats:
+    """Latency and error statistics of a source.
+
+    Attributes:
+        requests: Calls made to the source.
+        errors: Calls that failed or returned no data.
+        consecutive_errors: Failed calls since the last success.
+        latency: Smoothed duration of the successful calls, in seconds.
+            None until a call succeeds.
+        updated: Monotonic time the last call finished. None until then.
+    """
+
+    requests: int = 0
+    errors: int = 0
+    consecutive_errors: int = 0
+    latency: float | None = None
+    updated: float | None = None
+
+
+class HedgedSource:
+    """Fetch prices from the first of several sources to answer.
+
+    The primary source is queried first. If it has not answered after
+    `hedge_delay` seconds, or as soon as it fails, the next source is
+    queried too, and so on; the first valid result is returned. Sources
+    answering later still complete in the background, so that their
+    statistics stay current.
+
+    Sources are ranked by health and latency before each fetch: sources
+    failing since their last success go last, the others from the
+    fastest, and sources never measured keep their given order after
+    the measured ones. Statistics older than `probe_interval` are
+    re-measured by querying that source first, so a source that was
+    slow or failing once is not demoted for good. Offline sources,
+    which serve local data, are only ever fallbacks: they rank after
+    every source going to the network.
+
+    The sources should serve the same prices, e.g. a remote source and
+    a cache of it (`Source(..., offline=True)`).
+
+    Args:
+        sources: Sources in order of preference.
+        hedge_delay: Seconds to wait for a source before also
+            querying the next one.
+        probe_interval: Seconds after which the statistics of a source
+            are stale and it is queried first again.
+
+    Attributes:
+        sources: Sources in the given order.
+        stats: Statistics of each source, aligned with `sources`.
+        offline: Whether every source is offline.
+        granularity: Period of the prices, that of the primary source.
+
+    Raises:
+        ValueError: If no source is given.
+    """
+
+    def __init__(
+        self,
+        sources: Sequence[Union[Source, "HedgedSource"]],
+        hedge_delay: float = HEDGE_DELAY,
+        probe_interval: float = PROBE_INTERVAL,
+    ):
+        if not sources:
+            raise ValueError("at least one source is required")
+        self.sources = list(sources)
+        self.hedge_delay = hedge_delay
+        self.probe_interval = probe_interval
+        self.stats = [SourceStats() for _ in self.sources]
+        self._lock = threading.Lock()
+
+    @property
+    def offline(self) -> bool:
+        """Whether every source serves local data only."""
+        return all(getattr(source, "offline", False) for source in self.sources)
+
+    @property
+    def granularity(self) -> str:
+        """Period of the prices, that of the primary source."""
+        return getattr(self.sources[0], "granularity", "day")
+
+    def ranked(self) -> list[int]:
+        """Positions of the sources in the order they are queried."""
+        now = time.monotonic()
+
+        def rank(i: int) -> tuple:
+            stats = self.stats[i]
+            stale = (
+                stats.updated is not None and now - stats.updated >= self.probe_interval
+            )
+            return (
+                getattr(self.sources[i], "offline", False),
+                not stale,
+                stats.consecutive_errors > 0,
+                stats.latency is None,
+                stats.latency or 0.0,
+                i,
+            )
+
+        with self._lock:
+            return sorted(range(len(self.sources)), key=rank)
+
+    def get_data(self, coin: str, fiat: str) -> pd.DataFrame:
+        """Get historical OHLC data from the first source to answer.
+
+        Args:
+            coin: Coin symbol (e.g. "BTC").
+            fiat: Currency symbol (e.g. "USD").
+
+        Returns:
+            Historical OHLC data with Date and Close columns.
+
+        Raises:
+            DataSourceError: If every source fails.
+        """
+        queue = self.ranked()
+        pending: dict[Future, int] = {}
+        errors = []
+        pool = ThreadPoolExecutor(max_workers=len(queue))
+
+        def launch() -> None:
+            if queue:
+                i = queue.pop(0)
+                pending[pool.submit(self._fetch, i, coin, fiat)] = i
+
+        try:
+            launch()
+            while pending:
+                timeout = self.hedge_delay if queue else None
+                done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                if not done:
+                    # primary is slow, hedge to the next source
+                    launch()
+                    continue
+                for future in done:
+                    i = pending.pop(future)
+                    try:
+                        return future.result()
+                    except Exception as e:
+                        name = getattr(self.sources[i], "source", f"source {i}")
+                        errors.append(f"{name}: {e}")
+                        launch()
+        finally:
+            pool.shutdown(wait=False)
+        raise DataSourceError(f"All sources failed: {'; '.join(errors)}")
+
+    async def aget_data(self, coin: str, fiat: str) -> pd.DataFrame:
+        """Get historical OHLC data without blocking the event loop.
+
+        Args:
+            coin: Coin symbol (e.g. "BTC").
+            fiat: Currency symbol (e.g. "USD").
+
+        Returns:
+            Historical OHLC data with Date and Close columns.
+
+        Raises:
+            DataSourceError: If every source fails.
+        """
+        return await asyncio.to_thread(self.get_data, coin, fiat)
+
+    def _fetch(self, i: int, coin: str, fiat: str) -> pd.DataFrame:
+        """Fetch from a source, updating its statistics."""
+        start = time.perf_counter()
+        try:
+            data = self.sources[i].get_data(coin, fiat)
+            if data.empty:
+                raise DataSourceError("no data returned")
+        except Exception:
+            with self._lock:
+                stats = self.stats[i]
+                stats.requests += 1
+                stats.errors += 1
+                stats.consecutive_errors += 1
+                stats.updated = time.monotonic()
+            raise
+
+        latency = time.perf_counter() - start
+        with self._lock:
+            stats = self.stats[i]
+            stats.requests += 1
+            stats.consecutive_errors = 0
+            stats.updated = time.monotonic()
+            stats.latency = (
+                latency
+                if stats.latency is None
+                else LATENCY_SMOOTHING * latency
+                + (1 - LATENCY_SMOOTHING) * stats.latency
+            )
+        return data
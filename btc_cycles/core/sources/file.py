@@ -0,0 +1,172 @@
+"""file sources"""
+
+import asyncio
+from pathlib import Path
+from typing import Literal
+
+import pandas as pd
+
+from .cache import PriceCache
+from .composite import HedgedSource
+from .source import GRANULARITIES, DataSourceError, Source
+
+READERS = {
+    ".csv": lambda path: pd.read_csv(path, parse_dates=["Date"]),
+    ".parquet": pd.read_parquet,
+    ".pq": pd.read_parquet,
+    ".arrow": pd.read_feather,
+    ".feather": pd.read_feather,
+    ".ipc": pd.read_feather,
+}
+
+
+class FileSource:
+    """Reads historical prices from a local file.
+
+    The file holds Date and Close columns, like the prices returned by
+    the other sources, in CSV, Parquet or Arrow IPC (Feather) format,
+    chosen by the file extension.
+
+    Example:
+        >>> source = FileSource("prices/{coin}-{fiat}.parquet")
+        >>> btc = Bitcoin(source=source)
+
+    Args:
+        path: Path of the file. May contain "{coin}" and "{fiat}"
+            placeholders, to keep one file per pair.
+        granularity: Period of the prices, "day", "hour" or "minute".
+
+    Raises:
+        ValueError: If the file format or the granularity is not supported.
+    """
+
+    source = "file"
+    offline = True
+
+    def __init__(self, path: str | Path, granularity: str = "day"):
+        self.path = str(Path(path).expanduser())
+        if Path(self.path).suffix.lower() not in READERS:
+            raise ValueError(
+                f"unsupported file format, expected one of {sorted(READERS)}"
+            )
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"granularity must be one of {list(GRANULARITIES)}")
+        self.granularity = granularity
+
+    def get_data(self, coin: str, fiat: str) -> pd.DataFrame:
+        """Read historical prices of a pair.
+
+        Args:
+            coin: Coin symbol (e.g. "BTC").
+            fiat: Currency symbol (e.g. "USD").
+
+        Returns:
+            Historical prices with Date and Close columns, with naive
+            UTC dates.
+
+        Raises:
+            DataSourceError: If the file is missing, unreadable or lacks
+                the columns.
+        """
+        path = Path(self.path.format(coin=coin, fiat=fiat))
+        try:
+            data = READERS[path.suffix.lower()](path)[["Date", "Close"]]
+        except (OSError, KeyError, ValueError) as e:
+            raise DataSourceError(f"Error reading prices from '{path}': {e}") from e
+
+        dates = pd.to_datetime(data["Date"])
+        if dates.dt.tz is not None:
+            dates = dates.dt.tz_convert("UTC").dt.tz_localize(None)
+        return data.assign(Date=dates)
+
+    async def aget_data(self, coin: str, fiat: str) -> pd.DataFrame:
+        """Read historical prices of a pair in a worker thread."""
+        return await asyncio.to_thread(self.get_data, coin, fiat)
+
+
+class ReplaySource:
+    """Records the prices served by a source, or replays recorded ones.
+
+    In "record" mode prices are fetched from the wrapped source and
+    written to `directory`; in "replay" mode they are read back from it,
+    without touching the network. When a Bitcoin is built from a replay
+    source without a cache, the halving prediction is recorded to and
+    replayed from the same directory.
+
+    Example:
+        >>> live = Source("cryptocompare", api_key="YOUR_API_KEY")
+        >>> Bitcoin(source=ReplaySource("fixtures", live, mode="record"))
+        >>> Bitcoin(source=ReplaySource("fixtures"))
+
+    Args:
+        directory: Directory of the recordings.
+        source: Source to record. Not needed to replay.
+        mode: "record" or "replay". Defaults to "replay".
+        granularity: Period of the prices, "day", "hour" or "minute".
+            Defaults to the granularity of the source, or "day".
+            Recordings of each granularity are kept apart.
+
+    Raises:
+        ValueError: If the mode or the granularity is invalid, or
+            recording without a source.
+    """
+
+    source = "replay"
+
+    def __init__(
+        self,
+        directory: str | Path,
+        source: "Source | HedgedSource | FileSource | None" = None,
+        mode: Literal["record", "replay"] = "replay",
+        granularity: str | None = None,
+    ):
+        if mode not in ("record", "replay"):
+            raise ValueError("mode must be 'record' or 'replay'")
+        if mode == "record" and source is None:
+            raise ValueError("recording requires a source")
+        if granularity is None:
+            granularity = getattr(source, "granularity", "day")
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"granularity must be one of {list(GRANULARITIES)}")
+        self.granularity = granularity
+        # intraday prices are recorded apart from the daily ones
+        self._key = (
+            self.source if granularity == "day" else f"{self.source}-{granularity}"
+        )
+        self.recordings = PriceCache(directory)
+        self.directory = self.recordings.directory
+        self.wrapped = source
+        self.mode = mode
+
+    @property
+    def offline(self) -> bool:
+        """Whether prices are served without network access."""
+        return self.mode == "replay" or getattr(self.wrapped, "offline", False)
+
+    def get_data(self, coin: str, fiat: str) -> pd.DataFrame:
+        """Get historical prices, recording or replaying them.
+
+        Args:
+            coin: Coin symbol (e.g. "BTC").
+            fiat: Currency symbol (e.g. "USD").
+
+        Returns:
+            Historical prices with Date and Close columns.
+
+        Raises:
+            DataSourceError: If the source fails, or if replaying a pair
+                that was not recorded.
+        """
+        if self.mode == "replay":
+            data = self.recordings.load(self._key, coin, fiat)
+            if data is None:
+                raise DataSourceError(f"No recorded prices for {coin}/{fiat}")
+            return data
+
+        data = self.wrapped.get_data(coin, fiat)
+        self.recordings.save(self._key, coin, fiat, data)
+        return data
+
+    async def aget_data(self, coin: str, fiat: str) -> pd.DataFrame:
+        """Get historical prices in a worker thread."""
+        return await asyncio.to_thread(self.get_data, coin, fiat)
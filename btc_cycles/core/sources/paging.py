@@ -0,0 +1,154 @@
+"""paged history download"""
+
+import datetime as dt
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+import pandas as pd
+
+# points per page of the cryptocompare history endpoints
+PAGE_LIMIT = 2000
+MAX_WORKERS = 4
+# cryptocompare rate limit for the free tier is well above this
+REQUESTS_PER_SECOND = 5.0
+RETRIES = 3
+BACKOFF = 0.5
+
+
+class TokenBucket:
+    """Thread-safe token bucket limiting the request rate.
+
+    Args:
+        rate: Tokens added per second.
+        capacity: Maximum tokens held, i.e. the largest burst.
+    """
+
+    def __init__(self, rate: float = REQUESTS_PER_SECOND, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Take a token, waiting until one is available."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def _timestamp(date: dt.datetime) -> int:
+    """Unix timestamp of a date, naive dates being UTC."""
+    date = pd.Timestamp(date)
+    if date.tzinfo is None:
+        date = date.tz_localize("UTC")
+    return int(date.timestamp())
+
+
+def plan_windows(
+    start: dt.datetime,
+    end: dt.datetime,
+    step: dt.timedelta = dt.timedelta(days=1),
+    limit: int = PAGE_LIMIT,
+) -> list[int]:
+    """Plan the pages covering a time range.
+
+    A page ending at `to_ts` holds `limit + 1` points, the last one being
+    the period containing `to_ts`.
+
+    Args:
+        start: First date to cover.
+        end: Last date to cover.
+        step: Period of a point.
+        limit: Points per page, excluding the last one.
+
+    Returns:
+        End timestamp of each page, latest first.
+    """
+    start_ts, end_ts = _timestamp(start), _timestamp(end)
+    span = (limit + 1) * int(step.total_seconds())
+    pages = max(1, math.ceil((end_ts - start_ts + 1) / span))
+    return [end_ts - i * span for i in range(pages)]
+
+
+def fetch_pages(
+    fetch_page: Callable[[int], list[dict] | None],
+    windows: list[int],
+    max_workers: int = MAX_WORKERS,
+    bucket: TokenBucket | None = None,
+    retries: int = RETRIES,
+    backoff: float = BACKOFF,
+) -> list[list[dict]]:
+    """Fetch pages concurrently, with rate limiting and retries.
+
+    Args:
+        fetch_page: Fetches the page ending at a timestamp. Returns None
+            on a failure worth retrying (rate limiting, network errors)
+            and raises on any other, which is not retried.
+        windows: End timestamp of each page.
+        max_workers: Maximum concurrent requests.
+        bucket: Rate limiter shared by the requests. Unlimited if None.
+        retries: Retries of a failed page before giving up.
+        backoff: Wait before the first retry, doubled after each one.
+
+    Returns:
+        Points of each page, in the order of `windows`.
+
+    Raises:
+        RuntimeError: If a page still fails after all the retries.
+    """
+
+    def fetch(to_ts: int) -> list[dict]:
+        for attempt in range(retries + 1):
+            if attempt:
+                time.sleep(backoff * 2 ** (attempt - 1))
+            if bucket is not None:
+                bucket.acquire()
+            page = fetch_page(to_ts)
+            if page is not None:
+                return page
+        raise RuntimeError(f"page ending at {to_ts} failed after {retries} retries")
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(windows)))) as pool:
+        return list(pool.map(fetch, windows))
+
+
+def stitch_pages(pages: list[list[dict]], start: dt.datetime) -> pd.DataFrame:
+    """Stitch history pages into one frame.
+
+    Placeholder points with zero prices, returned before a pair was
+    listed, are dropped, as are points before `start`.
+
+    Args:
+        pages: Points of each page, with time (Unix seconds), open and close.
+        start: First date to keep.
+
+    Returns:
+        Prices with Date and Close columns, sorted and unique by date.
+    """
+    data = pd.DataFrame(
+        [point for page in pages for point in page],
+        columns=["time", "open", "close"],
+    )
+    data = data[
+        (data["time"] >= _timestamp(start)) & (data["open"] != 0) & (data["close"] != 0)
+    ]
+    data = data.drop_duplicates("time", keep="last").sort_values("time")
+    return pd.DataFrame(
+        {
+            "Date": pd.to_datetime(data["time"], unit="s"),
+            "Close": data["close"].astype(float),
+        }
+    ).reset_index(drop=True)
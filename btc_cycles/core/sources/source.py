@@ -1,14 +1,38 @@
 """Source class"""
 
+import asyncio
 import datetime as dt
+import os
 import warnings
+from pathlib import Path
+from typing import Callable
 
-import cryptocompare
 import pandas as pd
-from cryptocmd import CmcScraper
+import requests
+from requests.adapters import HTTPAdapter
+
+from ...instrumentation import stage
+from .cache import PriceCache
+from .paging import (
+    MAX_WORKERS,
+    PAGE_LIMIT,
+    TokenBucket,
+    fetch_pages,
+    plan_windows,
+    stitch_pages,
+)
 
 # earliest date available from cryptocompare
 START = dt.datetime(2010, 7, 17)
+CRYPTOCOMPARE_URL = "https://min-api.cryptocompare.com/data/v2/{}"
+REQUEST_TIMEOUT = 10
+# period of a price, the cryptocompare endpoint serving it, and how far
+# back the endpoint goes (minute prices are only kept for a week)
+GRANULARITIES = {
+    "day": (dt.timedelta(days=1), "histoday", None),
+    "hour": (dt.timedelta(hours=1), "histohour", None),
+    "minute": (dt.timedelta(minutes=1), "histominute", dt.timedelta(days=7)),
+}
 
 
 class DataSourceError(Exception):
@@ -18,14 +42,65 @@ class DataSourceError(Exception):
 class Source:
     """Fetches historical OHLC price data from a named source.
 
+    When a cache is given, previously fetched prices are read from it
+    and only the prices after the last cached one are requested from
+    the source.
+
+    Each source owns a keep-alive HTTP session sending its own API key,
+    so sources with different keys can be used from several threads.
+
     Args:
         source: Data source name (e.g. "cryptocompare").
-        api_key: API key for the data source.
+        api_key: API key for the data source. For cryptocompare, defaults
+            to the CRYPTOCOMPARE_API_KEY environment variable.
+        cache: Price cache, or a directory to keep one in.
+        offline: Serve prices from the cache only, without network access.
+        max_workers: Maximum concurrent page requests of a download.
+            Requests are also rate limited, across all the downloads of
+            this source.
+        granularity: Period of the prices, "day", "hour" or "minute".
+            Intraday prices are only available from cryptocompare, which
+            serves a limited history of them depending on the plan.
+
+    Attributes:
+        session: HTTP session of the source, pooling a connection per
+            concurrent request.
+
+    Raises:
+        ValueError: If offline is requested without a cache, or if the
+            granularity is not available.
     """
 
-    def __init__(self, source: str, api_key: str | None = None):
+    def __init__(
+        self,
+        source: str,
+        api_key: str | None = None,
+        cache: PriceCache | str | Path | None = None,
+        offline: bool = False,
+        max_workers: int = MAX_WORKERS,
+        granularity: str = "day",
+    ):
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"granularity must be one of {list(GRANULARITIES)}")
+        if granularity != "day" and source != "cryptocompare":
+            raise ValueError(f"source '{source}' only provides daily prices")
         self.source = source
+        self.granularity = granularity
+        # intraday prices are cached apart from the daily ones
+        self._key = source if granularity == "day" else f"{source}-{granularity}"
+        self.max_workers = max_workers
+        self._bucket = TokenBucket(capacity=max_workers)
+        self.session = requests.Session()
+        self.session.mount(
+            "https://", HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        )
         self.api_key = api_key
+        if cache is not None and not isinstance(cache, PriceCache):
+            cache = PriceCache(cache)
+        self.cache = cache
+        if offline and cache is None:
+            raise ValueError("offline mode requires a cache")
+        self.offline = offline
 
     def get_data(self, coin: str, fiat: str) -> pd.DataFrame:
         """Get historical OHLC data.
@@ -38,7 +113,8 @@ class Source:
             Historical OHLC data with Date and Close columns.
 
         Raises:
-            DataSourceError: If the source fails.
+            DataSourceError: If the source fails, or if offline
+                and nothing is cached.
             ValueError: If the source is not available.
         """
         fetchers = {
@@ -51,38 +127,132 @@ class Source:
         if fetcher is None:
             raise ValueError(f"source '{self.source}' not available")
 
-        return fetcher(coin, fiat)
+        if self.cache is None:
+            return self._fetch(fetcher, coin, fiat, START)
+
+        with stage("cache_load") as record:
+            cached = self.cache.load(self._key, coin, fiat)
+            record.rows = 0 if cached is None else len(cached)
+        if self.offline:
+            if cached is None:
+                raise DataSourceError(
+                    f"No cached data for '{self.source}' {coin}/{fiat}"
+                )
+            return cached
+
+        # refetch the last cached period, its close may have been partial
+        start = START if cached is None else cached["Date"].iloc[-1]
+        fetched = self._fetch(fetcher, coin, fiat, start)
+        with stage("cache_merge") as record:
+            data = self.cache.update(self._key, coin, fiat, cached, fetched)
+            record.rows = len(data)
+        return data
+
+    async def aget_data(self, coin: str, fiat: str) -> pd.DataFrame:
+        """Get historical OHLC data without blocking the event loop.
+
+        The fetch and cache I/O run in a worker thread, so other tasks,
+        like the halving prediction request, proceed meanwhile.
+
+        Args:
+            coin: Coin symbol (e.g. "BTC").
+            fiat: Currency symbol (e.g. "USD").
+
+        Returns:
+            Historical OHLC data with Date and Close columns.
+
+        Raises:
+            DataSourceError: If the source fails, or if offline
+                and nothing is cached.
+            ValueError: If the source is not available.
+        """
+        return await asyncio.to_thread(self.get_data, coin, fiat)
+
+    @staticmethod
+    def _fetch(
+        fetcher: Callable[[str, str, dt.datetime], pd.DataFrame],
+        coin: str,
+        fiat: str,
+        start: dt.datetime,
+    ) -> pd.DataFrame:
+        """Call a fetcher, recording the rows it returned."""
+        with stage("price_fetch") as record:
+            data = fetcher(coin, fiat, start)
+            record.rows = len(data)
+        return data
+
+    def _fetch_cryptocompare(
+        self, coin: str, fiat: str, start: dt.datetime
+    ) -> pd.DataFrame:
+        step, endpoint, history = GRANULARITIES[self.granularity]
+        url = CRYPTOCOMPARE_URL.format(endpoint)
+        api_key = self.api_key or os.getenv("CRYPTOCOMPARE_API_KEY")
+        headers = {"authorization": f"Apikey {api_key}"} if api_key else {}
+
+        def fetch_page(to_ts: int) -> list[dict] | None:
+            params = {"fsym": coin, "tsym": fiat, "limit": PAGE_LIMIT, "toTs": to_ts}
+            try:
+                with stage("price_page") as record:
+                    response = self.session.get(
+                        url,
+                        params=params,
+                        headers=headers,
+                        timeout=REQUEST_TIMEOUT,
+                    )
+                    record.bytes = len(response.content)
+            except (requests.ConnectionError, requests.Timeout):
+                return None
+            if response.status_code == 429 or response.status_code >= 500:
+                return None
+            response.raise_for_status()
+
+            payload = response.json()
+            if payload.get("Response") == "Error":
+                message = payload.get("Message", "")
+                # rate limiting is reported with a 200 status
+                if "rate limit" in message.lower():
+                    return None
+                raise DataSourceError(message)
+            return payload["Data"]["Data"]
 
-    def _fetch_cryptocompare(self, coin: str, fiat: str) -> pd.DataFrame:
         try:
-            cryptocompare.cryptocompare._set_api_key_parameter(self.api_key)
-            data = cryptocompare.get_historical_price_day_from(
-                coin=coin, currency=fiat, fromTs=START
+            # pages are planned upfront and downloaded concurrently
+            now = dt.datetime.now(dt.timezone.utc)
+            if history is not None:
+                start = max(start, now.replace(tzinfo=None) - history)
+            windows = plan_windows(start, now, step)
+            pages = fetch_pages(
+                fetch_page, windows, max_workers=self.max_workers, bucket=self._bucket
             )
-            data = pd.DataFrame(data)
-            data["time"] = pd.to_datetime(data["time"], unit="s")
-            data.rename({"time": "Date", "close": "Close"}, axis=1, inplace=True)
-            return data[["Date", "Close"]]
+            return stitch_pages(pages, start)
         except Exception as e:
             raise DataSourceError(
                 f"Error getting data from 'cryptocompare': {e}"
             ) from e
 
-    def _fetch_coinmarketcap_free(self, coin: str, fiat: str) -> pd.DataFrame:
+    def _fetch_coinmarketcap_free(
+        self, coin: str, fiat: str, start: dt.datetime
+    ) -> pd.DataFrame:
         warnings.warn(
             "The 'coinmarketcap-free' source is broken,"
             " and if a fix is not found,"
             " it will be removed in the future.",
-            stacklevel=3,
+            # past _fetch and get_data, at the caller of get_data
+            stacklevel=4,
         )
+        from cryptocmd import CmcScraper
+
         try:
             scraper = CmcScraper(coin, fiat=fiat)
             scraper.get_data()
-            return scraper.get_dataframe()[["Date", "Close"]]
+            data = scraper.get_dataframe()[["Date", "Close"]]
+            return data[data["Date"] >= start]
         except Exception as e:
             raise DataSourceError(
                 f"Error getting data from 'coinmarketcap-free': {e}"
             ) from e
 
-    def _fetch_coinmarketcap(self, coin: str, fiat: str) -> pd.DataFrame:
+    def _fetch_coinmarketcap(
+        self, coin: str, fiat: str, start: dt.datetime
+    ) -> pd.DataFrame:
         raise NotImplementedError("CoinMarketCap API v2 not implemented")
@@ -0,0 +1,273 @@
+"""memory-mapped price store module"""
+
+import json
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ..utils import atomic_write
+from .cache import PriceCache
+
+INDEX_FILE = "index.json"
+
+
+def _encode(values: pd.Series) -> tuple[np.ndarray, dict]:
+    """Raw values of a column and the description needed to decode them."""
+    dtype = values.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy(), {
+            "dtype": "category",
+            "categories": values.cat.categories.tolist(),
+        }
+    if isinstance(dtype, pd.DatetimeTZDtype):
+        naive = values.dt.tz_convert("UTC").dt.tz_localize(None).to_numpy()
+        return naive, {"dtype": str(dtype)}
+    if dtype.kind not in "biufM":
+        raise TypeError(f"column '{values.name}' of dtype {dtype} cannot be stored")
+    return values.to_numpy(), {"dtype": str(dtype)}
+
+
+def _decode(raw: np.ndarray, column: dict) -> "pd.Series | np.ndarray":
+    """Column values from their raw values."""
+    dtype = column["dtype"]
+    if dtype == "category":
+        return pd.Categorical.from_codes(raw, categories=column["categories"])
+    if dtype.startswith("datetime64[") and "," in dtype:
+        tz = pd.DatetimeTZDtype.construct_from_string(dtype).tz
+        return pd.Series(raw).dt.tz_localize("UTC").dt.tz_convert(tz)
+    return raw
+
+
+class PriceStore(PriceCache):
+    """Memory-mapped store of many price series.
+
+    Each series is kept as one raw binary file per column, and a small
+    JSON index holds the rows and column types of every series. Series
+    are read as memory-mapped arrays, so processes reading the same
+    store share its pages through the OS page cache rather than each
+    holding a copy, and appending new prices only writes the tail of
+    the files.
+
+    As a price cache, a store keeps the Date and Close columns of each
+    (source, coin, fiat) key, e.g. `Source(..., cache=PriceStore(path))`.
+    Any frame of numeric, boolean, datetime or categorical columns can
+    be stored too, such as the prices with their metrics.
+
+    A store supports any number of readers but a single writing process.
+    Rows replaced in place, like the last candle when it is refetched,
+    may change under readers mapping them.
+
+    Example:
+        >>> store = PriceStore("~/.cache/btc-cycles")
+        >>> btc = Bitcoin(cache=store)
+        >>> store.write("btc-usd-metrics", btc.prices)
+
+    Args:
+        directory: Directory where the store files are kept.
+            Created on first write.
+    """
+
+    def __init__(self, directory: str | Path):
+        super().__init__(directory)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(source: str, coin: str, fiat: str) -> str:
+        """Series name of a cache key."""
+        return f"{source}-{coin}-{fiat}".lower()
+
+    def path(self, source: str, coin: str, fiat: str) -> Path:
+        """Path prefix of the column files for a key.
+
+        Args:
+            source: Data source name.
+            coin: Coin symbol (e.g. "BTC").
+            fiat: Currency symbol (e.g. "USD").
+
+        Returns:
+            Path prefix, completed by ".<column>.bin".
+        """
+        return self.directory / self.key(source, coin, fiat)
+
+    def keys(self) -> list[str]:
+        """Names of the stored series."""
+        return list(self._read_index())
+
+    def read(self, name: str, columns: list[str] | None = None) -> pd.DataFrame | None:
+        """Read a series, memory-mapping its columns.
+
+        Numeric, boolean and naive datetime columns are read-only views
+        of the mapped files.
+
+        Args:
+            name: Series name.
+            columns: Columns to read. Defaults to all.
+
+        Returns:
+            The series, or None if it is not stored.
+        """
+        series = self._read_index().get(name)
+        if series is None:
+            return None
+        rows = series["rows"]
+        data = {}
+        for column, description in series["columns"].items():
+            if columns is not None and column not in columns:
+                continue
+            raw_dtype = np.dtype(description["raw"])
+            if rows == 0:
+                raw = np.empty(0, dtype=raw_dtype)
+            else:
+                raw = np.memmap(
+                    self._column_path(name, column),
+                    dtype=raw_dtype,
+                    mode="r",
+                    shape=(rows,),
+                ).view(np.ndarray)
+            data[column] = _decode(raw, description)
+        return pd.DataFrame(data, copy=False)
+
+    def write(self, name: str, data: pd.DataFrame, start: int | None = None) -> None:
+        """Write rows of a series from position `start` on.
+
+        Rows after `start` are replaced by `data`. Writing from 0 replaces
+        the series, columns included; otherwise `data` must have the
+        columns of the stored series, and only the tail of the files is
+        written.
+
+        Args:
+            name: Series name.
+            data: Rows to write.
+            start: Position of the first row written. Defaults to the
+                end of the series, appending the rows.
+
+        Raises:
+            ValueError: If `start` is past the end of the series, or the
+                columns do not match the stored ones.
+            TypeError: If a column cannot be stored.
+        """
+        with self._lock:
+            index = self._read_index()
+            series = index.get(name, {"rows": 0, "columns": {}})
+            start = series["rows"] if start is None else start
+            if start > series["rows"]:
+                raise ValueError(
+                    f"cannot write '{name}' from row {start},"
+                    f" it has {series['rows']} rows"
+                )
+            if start > 0 and set(data.columns) != set(series["columns"]):
+                raise ValueError(
+                    f"columns {sorted(data.columns)} do not match"
+                    f" the stored {sorted(series['columns'])}"
+                )
+
+            self.directory.mkdir(parents=True, exist_ok=True)
+            columns = {}
+            for column in data.columns:
+                raw, description = _encode(data[column])
+                if start == 0:
+                    description["raw"] = str(raw.dtype)
+                    # readers keep mapping the replaced file
+                    with atomic_write(self._column_path(name, column)) as tmp:
+                        raw.tofile(tmp)
+                else:
+                    stored = series["columns"][column]
+                    if (description["dtype"] == "category") != (
+                        stored["dtype"] == "category"
+                    ) or description.get("categories") != stored.get("categories"):
+                        raise ValueError(f"column '{column}' does not match")
+                    if not np.can_cast(raw.dtype, stored["raw"], "same_kind"):
+                        raise ValueError(f"column '{column}' does not match")
+                    description = stored
+                    raw = raw.astype(stored["raw"], copy=False)
+                    # files never shrink, so the pages readers map stay valid
+                    with open(self._column_path(name, column), "r+b") as f:
+                        f.seek(start * raw.itemsize)
+                        raw.tofile(f)
+                columns[column] = description
+
+            if start == 0:
+                for column in set(series["columns"]) - set(columns):
+                    self._column_path(name, column).unlink(missing_ok=True)
+            index[name] = {"rows": start + len(data), "columns": columns}
+            self._write_index(index)
+
+    def load(self, source: str, coin: str, fiat: str) -> pd.DataFrame | None:
+        """Load cached prices for a key.
+
+        Args:
+            source: Data source name.
+            coin: Coin symbol (e.g. "BTC").
+            fiat: Currency symbol (e.g. "USD").
+
+        Returns:
+            Cached prices sorted by date, or None if nothing is cached.
+        """
+        return self.read(self.key(source, coin, fiat))
+
+    def save(self, source: str, coin: str, fiat: str, data: pd.DataFrame) -> None:
+        """Store prices for a key, replacing what was cached.
+
+        Args:
+            source: Data source name.
+            coin: Coin symbol (e.g. "BTC").
+            fiat: Currency symbol (e.g. "USD").
+            data: Prices with Date and Close columns.
+        """
+        self.write(self.key(source, coin, fiat), data[["Date", "Close"]], start=0)
+
+    def update(
+        self,
+        source: str,
+        coin: str,
+        fiat: str,
+        cached: pd.DataFrame | None,
+        fetched: pd.DataFrame,
+    ) -> pd.DataFrame:
+        """Merge freshly fetched prices into the cached ones and store them.
+
+        Cached rows from the first fetched date on are replaced by the
+        fetched rows, so only the tail of the series is written.
+
+        Args:
+            source: Data source name.
+            coin: Coin symbol (e.g. "BTC").
+            fiat: Currency symbol (e.g. "USD").
+            cached: Previously cached prices, if any.
+            fetched: Prices fetched from the source.
+
+        Returns:
+            Merged prices sorted by date.
+        """
+        fetched = (
+            fetched[["Date", "Close"]]
+            .drop_duplicates("Date", keep="last")
+            .sort_values("Date")
+            .reset_index(drop=True)
+        )
+        if cached is None or cached.empty:
+            self.save(source, coin, fiat, fetched)
+        elif fetched.empty:
+            return cached
+        else:
+            start = int(cached["Date"].searchsorted(fetched["Date"].iat[0]))
+            self.write(self.key(source, coin, fiat), fetched, start=start)
+        return self.load(source, coin, fiat)
+
+    def _column_path(self, name: str, column: str) -> Path:
+        """Path of the file of a column."""
+        return self.directory / f"{name}.{column}.bin"
+
+    def _read_index(self) -> dict:
+        """Rows and columns of every series."""
+        path = self.directory / INDEX_FILE
+        if not path.exists():
+            return {}
+        return json.loads(path.read_text())
+
+    def _write_index(self, index: dict) -> None:
+        """Replace the index, atomically for readers."""
+        with atomic_write(self.directory / INDEX_FILE) as tmp:
+            tmp.write_text(json.dumps(index, indent=1))
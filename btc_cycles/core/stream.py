@@ -0,0 +1,261 @@
+"""streaming metrics module
+
+Computes the price metrics of histories too large to hold in memory,
+one chunk at a time, so that memory is bounded by the chunk size.
+"""
+
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from ..instrumentation import stage
+from .prices import (
+    CYCLE_LOW_SEPARATION_DAYS,
+    _find_cycle_progress,
+    _fmt_prices,
+    _segment_lows,
+)
+from .sources import GRANULARITIES
+from .utils import atomic_write, temporary_path
+
+# rows per chunk read from a file
+CHUNK_ROWS = 1_000_000
+
+
+def read_chunks(
+    path: str | Path, chunk_rows: int = CHUNK_ROWS
+) -> Iterator[pd.DataFrame]:
+    """Read prices from a CSV or Parquet file in chunks.
+
+    Args:
+        path: Path of the file, with Date and Close columns.
+        chunk_rows: Rows per chunk.
+
+    Yields:
+        Prices with Date and Close columns.
+
+    Raises:
+        ValueError: If the file format is not supported.
+    """
+    path = Path(path).expanduser()
+    suffix = path.suffix.lower()
+    if suffix == ".csv":
+        yield from pd.read_csv(path, parse_dates=["Date"], chunksize=chunk_rows)
+    elif suffix in (".parquet", ".pq"):
+        batches = pq.ParquetFile(path).iter_batches(
+            batch_size=chunk_rows, columns=["Date", "Close"]
+        )
+        for batch in batches:
+            yield batch.to_pandas()
+    else:
+        raise ValueError("unsupported file format, expected .csv or .parquet")
+
+
+class MetricsStream:
+    """Compute price metrics chunk by chunk.
+
+    Carries the state the metrics need across chunks: the running ATH,
+    the last date seen and, for the cycle lows, the minimum distance
+    from ATH of every day. Chunks are enriched with the same columns as
+    `Prices.data`, except that `is_cycle_low` is False until the cycle
+    is completed; the lows of the completed cycles are given by `lows`.
+
+    For intraday prices, the second low of a cycle is searched among the
+    daily minima, so its separation from the first low is measured
+    between minima. For daily prices, the lows are those of `Prices`.
+
+    Example:
+        >>> stream = MetricsStream(halvings)
+        >>> for chunk in read_chunks("prices.parquet"):
+        ...     enriched = stream.process(chunk)
+        >>> stream.lows()
+
+    Args:
+        halvings: Halving data.
+        compact: Only attach a categorical cycle_id referencing
+            `halvings`, see `Prices`.
+        price_dtype: Float dtype of the prices and metrics.
+        granularity: Period of the prices, "day", "hour" or "minute".
+        min_separation_days: Minimum days between two lows of a cycle
+            to consider them distinct.
+
+    Attributes:
+        rows: Rows processed so far.
+    """
+
+    def __init__(
+        self,
+        halvings: pd.DataFrame,
+        compact: bool = False,
+        price_dtype: str = "float64",
+        granularity: str = "day",
+        min_separation_days: int = CYCLE_LOW_SEPARATION_DAYS,
+    ):
+        self.halvings = halvings
+        self.compact = compact
+        self.price_dtype = price_dtype
+        self.unit = pd.Timedelta(GRANULARITIES[granularity][0])
+        self.min_separation_days = min_separation_days
+        self.rows = 0
+        self._ath = -np.inf
+        self._last_date: pd.Timestamp | None = None
+        self._last_cycle = np.nan
+        # daily minima of each chunk, in chronological order
+        self._minima: list[pd.DataFrame] = []
+
+    def process(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """Enrich the next chunk of prices with the metrics.
+
+        Args:
+            chunk: Prices with Date and Close columns, all dated after
+                the previous chunks.
+
+        Returns:
+            Prices with cycle columns and metrics.
+
+        Raises:
+            ValueError: If a price is not dated after the previous chunks.
+        """
+        with stage("metrics", rows=len(chunk)):
+            data = _fmt_prices(chunk, self.halvings, self.compact, self.price_dtype)
+            if data.empty:
+                return data
+            if self._last_date is not None and data["Date"].iat[0] <= self._last_date:
+                raise ValueError("chunks must be in chronological order")
+
+            close = data["Close"].to_numpy()
+            data["ATH"] = np.maximum.accumulate(np.r_[self._ath, close])[1:].astype(
+                close.dtype
+            )
+            data["distance_ath_perc"] = (data["Close"] - data["ATH"]) / data["ATH"]
+            data["is_cycle_low"] = False
+            data = _find_cycle_progress(data, self.halvings, self.unit)
+            data["cycle_progress"] = data["cycle_progress"].astype(self.price_dtype)
+
+            self._ath = data["ATH"].iat[-1]
+            self._last_date = data["Date"].iat[-1]
+            self._last_cycle = float(data["cycle_id"].to_numpy(dtype=float)[-1])
+            self._minima.append(self._daily_minima(data))
+            self.rows += len(data)
+        return data
+
+    @staticmethod
+    def _daily_minima(data: pd.DataFrame) -> pd.DataFrame:
+        """Row of the first minimum distance from ATH of each day."""
+        frame = pd.DataFrame(
+            {
+                "Date": data["Date"],
+                "cycle_id": data["cycle_id"].to_numpy(dtype=float),
+                "distance_ath_perc": data["distance_ath_perc"].to_numpy(dtype=float),
+            }
+        )
+        frame = frame[frame["cycle_id"].notna() & frame["distance_ath_perc"].notna()]
+        first = frame.groupby(frame["Date"].dt.floor("D"), sort=False)[
+            "distance_ath_perc"
+        ].idxmin()
+        return frame.loc[first.to_numpy()]
+
+    def lows(self) -> pd.DataFrame:
+        """Cycle lows of the completed cycles processed so far.
+
+        Returns:
+            Date, cycle_id and distance_ath_perc of the lows, by date.
+        """
+        columns = ["Date", "cycle_id", "distance_ath_perc"]
+        if not self._minima:
+            return pd.DataFrame(columns=columns)
+
+        minima = pd.concat(self._minima, ignore_index=True)
+        # a day split across chunks keeps its earliest minimum
+        first = minima.groupby(minima["Date"].dt.floor("D"), sort=False)[
+            "distance_ath_perc"
+        ].idxmin()
+        minima = minima.loc[first.to_numpy()]
+        self._minima = [minima]
+
+        completed = minima[minima["cycle_id"] < self._last_cycle]
+        lows = _segment_lows(
+            completed["distance_ath_perc"].to_numpy(),
+            completed["Date"].to_numpy(dtype="datetime64[ns]"),
+            completed["cycle_id"].to_numpy(),
+            self.min_separation_days,
+        )
+        return completed.iloc[lows][columns].reset_index(drop=True)
+
+
+def stream_metrics(
+    chunks: Iterable[pd.DataFrame],
+    halvings: pd.DataFrame,
+    path: str | Path,
+    compact: bool = False,
+    price_dtype: str = "float64",
+    granularity: str = "day",
+) -> pd.DataFrame:
+    """Compute the metrics of a price history and write them to Parquet.
+
+    Enriched chunks are written as they are processed, one row group
+    each. The cycle lows are only known once the history has been read,
+    so the row groups are then copied one by one to `path` with
+    `is_cycle_low` set; the file holds the columns of `Prices.data`.
+
+    Example:
+        >>> halvings = Halvings(prediction=get_halving_data()).data
+        >>> stream_metrics(read_chunks("minutes.parquet"), halvings, "out.parquet")
+
+    Args:
+        chunks: Prices with Date and Close columns, in chronological order.
+        halvings: Halving data.
+        path: Path of the Parquet file written.
+        compact: Only attach a categorical cycle_id referencing `halvings`.
+        price_dtype: Float dtype of the prices and metrics.
+        granularity: Period of the prices, "day", "hour" or "minute".
+
+    Returns:
+        The cycle lows, as returned by `MetricsStream.lows`.
+
+    Raises:
+        ValueError: If the chunks are not in chronological order.
+    """
+    path = Path(path).expanduser()
+    stream = MetricsStream(halvings, compact, price_dtype, granularity)
+
+    with temporary_path(path, suffix=".partial") as partial:
+        writer = None
+        try:
+            for chunk in chunks:
+                data = stream.process(chunk)
+                if data.empty:
+                    continue
+                table = pa.Table.from_pandas(data, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(partial, table.schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+
+        lows = stream.lows()
+        if writer is None:
+            return lows
+
+        low_dates = lows["Date"].to_numpy(dtype="datetime64[ns]")
+        with (
+            atomic_write(path) as tmp,
+            pq.ParquetFile(partial) as source,
+            pq.ParquetWriter(tmp, source.schema_arrow) as writer,
+        ):
+            for i in range(source.num_row_groups):
+                data = source.read_row_group(i).to_pandas()
+                data["is_cycle_low"] = np.isin(
+                    data["Date"].to_numpy(dtype="datetime64[ns]"), low_dates
+                )
+                writer.write_table(
+                    pa.Table.from_pandas(
+                        data, schema=source.schema_arrow, preserve_index=False
+                    )
+                )
+    return lows
@@ -0,0 +1,54 @@
+"""common utils for the core modules"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+
+@contextmanager
+def temporary_path(path: Path, suffix: str = ".tmp") -> Iterator[Path]:
+    """Unique temporary file next to `path`, removed on exit.
+
+    The file is created empty in the directory of `path`, creating the
+    directory if needed, so that it can be renamed over `path`.
+
+    Args:
+        path: Path the temporary file stands in for.
+        suffix: Suffix of the temporary file.
+
+    Yields:
+        Path of the temporary file.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, name = tempfile.mkstemp(dir=path.parent, prefix=f"{path.name}.", suffix=suffix)
+    os.close(fd)
+    tmp = Path(name)
+    try:
+        yield tmp
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+@contextmanager
+def atomic_write(path: Path) -> Iterator[Path]:
+    """Write a file through a temporary one, renamed over it on success.
+
+    Readers never see a partial file, and concurrent writers of the same
+    path each write their own temporary file, the last rename winning.
+    If the block raises, `path` is left untouched.
+
+    Example:
+        >>> with atomic_write(path) as tmp:
+        ...     data.to_parquet(tmp)
+
+    Args:
+        path: Path of the file to write.
+
+    Yields:
+        Path to write the content to.
+    """
+    with temporary_path(path) as tmp:
+        yield tmp
+        os.replace(tmp, path)
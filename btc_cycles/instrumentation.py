@@ -0,0 +1,175 @@
+"""instrumentation module
+
+Opt-in timing and memory records of the pipeline stages. Nothing is
+measured unless a hook is registered, either with `add_hook` or for the
+duration of an `instrument` block.
+"""
+
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Iterator
+
+
+@dataclass
+class StageRecord:
+    """Measurements of one pipeline stage.
+
+    Attributes:
+        stage: Stage name (e.g. "price_fetch", "metrics", "render_static").
+        wall_time: Wall time in seconds, nested stages included.
+        rows: Rows produced or processed, when it applies.
+        bytes: Bytes fetched over the network, when known.
+        peak_alloc: Peak bytes allocated by the stage above what was
+            allocated when it started. Only set when memory is traced.
+        error: Type and message of the exception the stage raised, e.g.
+            a timed out request. None if it completed.
+    """
+
+    stage: str
+    wall_time: float = 0.0
+    rows: int | None = None
+    bytes: int | None = None
+    peak_alloc: int | None = None
+    error: str | None = None
+
+
+Hook = Callable[[StageRecord], None]
+
+_hooks: list[Hook] = []
+_traced_hooks = 0
+# whether tracing was started by a hook, rather than already on
+_started_tracing = False
+_lock = threading.Lock()
+# stages being measured in each thread, innermost last, with the
+# current allocation at their start and the peak seen by nested stages
+_local = threading.local()
+
+
+def add_hook(hook: Hook, trace_memory: bool = False) -> None:
+    """Register a hook called with the record of every finished stage.
+
+    Hooks are called from the thread that ran the stage, nested stages
+    before the enclosing one.
+
+    Args:
+        hook: Callable receiving a StageRecord.
+        trace_memory: Also record peak allocations. Memory tracing slows
+            the pipeline down considerably, so it is off by default.
+    """
+    global _traced_hooks, _started_tracing
+    with _lock:
+        _hooks.append(hook)
+        _traced_hooks += trace_memory
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracing = True
+
+
+def remove_hook(hook: Hook, trace_memory: bool = False) -> None:
+    """Unregister a hook added with `add_hook`.
+
+    Memory tracing is stopped with the last traced hook, unless it was
+    already on before the first one was added.
+
+    Args:
+        hook: Hook to remove.
+        trace_memory: Whether the hook was added with memory tracing.
+
+    Raises:
+        ValueError: If the hook is not registered.
+    """
+    global _traced_hooks, _started_tracing
+    with _lock:
+        _hooks.remove(hook)
+        if not trace_memory or _traced_hooks == 0:
+            return
+        _traced_hooks -= 1
+        if _traced_hooks == 0 and _started_tracing:
+            _started_tracing = False
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+
+
+@contextmanager
+def instrument(
+    hook: Hook | None = None, trace_memory: bool = False
+) -> Iterator[list[StageRecord]]:
+    """Record the stages run inside the block.
+
+    Example:
+        >>> with instrument() as records:
+        ...     btc = Bitcoin()
+        ...     btc.plot()
+        >>> [(r.stage, r.wall_time) for r in records]
+
+    Args:
+        hook: Optional callable also receiving each record as it is emitted.
+        trace_memory: Also record peak allocations.
+
+    Yields:
+        List the records are appended to, in completion order.
+    """
+    records: list[StageRecord] = []
+
+    def collect(record: StageRecord) -> None:
+        records.append(record)
+        if hook is not None:
+            hook(record)
+
+    add_hook(collect, trace_memory=trace_memory)
+    try:
+        yield records
+    finally:
+        remove_hook(collect, trace_memory=trace_memory)
+
+
+@contextmanager
+def stage(name: str, rows: int | None = None) -> Iterator[StageRecord]:
+    """Measure a pipeline stage and emit its record to the hooks.
+
+    The yielded record can be completed inside the block, e.g. with the
+    rows or bytes fetched. A stage that raises is emitted too, with the
+    exception in its `error`. When no hook is registered nothing is
+    measured.
+
+    Args:
+        name: Stage name.
+        rows: Rows processed, if known upfront.
+
+    Yields:
+        The stage record.
+    """
+    record = StageRecord(stage=name, rows=rows)
+    if not _hooks:
+        yield record
+        return
+
+    stack = _local.__dict__.setdefault("stack", [])
+    traced = tracemalloc.is_tracing() and _traced_hooks > 0
+    if traced:
+        current, peak = tracemalloc.get_traced_memory()
+        if stack:
+            stack[-1][1] = max(stack[-1][1], peak)
+        tracemalloc.reset_peak()
+    frame = [current if traced else 0, 0]
+    stack.append(frame)
+
+    start = time.perf_counter()
+    try:
+        yield record
+    except BaseException as e:
+        record.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        record.wall_time = time.perf_counter() - start
+        stack.pop()
+        if traced and tracemalloc.is_tracing():
+            peak = max(tracemalloc.get_traced_memory()[1], frame[1])
+            record.peak_alloc = peak - frame[0]
+            if stack:
+                stack[-1][1] = max(stack[-1][1], peak)
+        for hook in list(_hooks):
+            hook(record)
@@ -10,6 +10,9 @@ import pytest
 def mock_bitcoin(mocker, test_prices):
     """Mock Bitcoin object with test prices and halving data."""
     bitcoin = mocker.MagicMock()
+    bitcoin.coin = "BTC"
+    bitcoin.currency = "USD"
+    bitcoin.granularity = "day"
     bitcoin.prices = test_prices
     bitcoin.halvings = pd.DataFrame(
         {
@@ -26,3 +29,13 @@ def mock_bitcoin(mocker, test_prices):
     )
     bitcoin.predicted_halving_block = 1050000
     return bitcoin
+
+
+@pytest.fixture
+def mock_bitcoin_with_lows(mock_bitcoin):
+    """Mock Bitcoin with enough cycle lows to draw the probability band."""
+    prices = mock_bitcoin.prices.copy()
+    prices["is_cycle_low"] = False
+    prices.loc[[300, 350, 420, 500], "is_cycle_low"] = True
+    mock_bitcoin.prices = prices
+    return mock_bitcoin
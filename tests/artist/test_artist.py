@@ -1,5 +1,6 @@
 """test artist theme handling — behaviour tests"""
 
+import pandas as pd
 import pytest
 
 from btc_cycles.artist.artist import THEMES, Artist
@@ -52,3 +53,16 @@ class TestThemeResolution:
     def test_invalid_kind_raises(self, mock_bitcoin):
         with pytest.raises(ValueError):
             Artist(mock_bitcoin, kind="invalid", theme="light")
+
+
+class TestRenderDoesNotMutate:
+    @pytest.mark.parametrize("kind", ["static", "interactive"])
+    def test_prices_unchanged_after_plot(self, mock_bitcoin, kind):
+        before = mock_bitcoin.prices.copy()
+        Artist(mock_bitcoin, kind=kind, theme="light").plot(from_date="2021-01-01")
+        pd.testing.assert_frame_equal(mock_bitcoin.prices, before)
+
+    @pytest.mark.parametrize("kind", ["static", "interactive"])
+    def test_artist_shares_prices(self, mock_bitcoin, kind):
+        artist = Artist(mock_bitcoin, kind=kind, theme="light")
+        assert artist.artist.bitcoin.prices is mock_bitcoin.prices
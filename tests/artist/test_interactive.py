@@ -38,3 +38,33 @@ class TestInteractiveArtist:
         html = fig.to_html()
         assert "<div" in html
         assert "plotly" in html.lower() or "Plotly" in html
+
+    def test_hover_uses_template_and_customdata(self, mock_bitcoin):
+        artist = Artist(mock_bitcoin, kind="interactive", theme="light")
+        fig = artist.plot(from_date="2020-05-11")
+        data_trace = next(t for t in fig.data if t.customdata is not None)
+        assert "%{customdata[0]" in data_trace.hovertemplate
+        assert len(data_trace.customdata) == len(data_trace.r)
+        assert data_trace.text[0] == "2020-05-11"
+
+    def test_low_probability_band_is_single_trace(self, mock_bitcoin_with_lows):
+        artist = Artist(mock_bitcoin_with_lows, kind="interactive", theme="light")
+        fig = artist.plot(from_date="2020-05-11")
+        bands = [t for t in fig.data if isinstance(t, go.Barpolar)]
+        assert len(bands) == 1
+        assert len(bands[0].theta) > 1
+
+    def test_labels_show_currency(self, mock_bitcoin):
+        mock_bitcoin.currency = "EUR"
+        fig = Artist(mock_bitcoin, kind="interactive", theme="light").plot()
+        assert fig.layout.title.text == "BTCEUR price halving cycles"
+        assert "BTC/EUR" in [trace.name for trace in fig.data]
+
+    def test_hover_shows_currency(self, mock_bitcoin_with_lows):
+        mock_bitcoin_with_lows.currency = "EUR"
+        fig = Artist(mock_bitcoin_with_lows, kind="interactive", theme="light").plot()
+        hovers = [t.hovertemplate for t in fig.data if t.hovertemplate]
+        hovers += [text for t in fig.data if t.hoverinfo == "text" for text in t.text]
+        prices = [hover for hover in hovers if "Price" in hover]
+        assert len(prices) == 4
+        assert all("EUR" in hover and "$" not in hover for hover in prices)
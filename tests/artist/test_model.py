@@ -0,0 +1,39 @@
+"""test chart model — behaviour tests"""
+
+from btc_cycles.artist.artist import Artist
+from btc_cycles.artist.model import GRID_INTERVALS, ChartModel
+
+
+class TestChartModel:
+    def test_one_color_per_price(self, mock_bitcoin):
+        model = ChartModel(mock_bitcoin)
+        assert len(model.rgba) == len(mock_bitcoin.prices)
+        assert len(model.hex) == len(mock_bitcoin.prices)
+
+    def test_no_band_with_fewer_than_two_lows(self, mock_bitcoin):
+        assert len(ChartModel(mock_bitcoin).band_progress) == 0
+
+    def test_band_above_threshold(self, mock_bitcoin_with_lows):
+        model = ChartModel(mock_bitcoin_with_lows)
+        assert len(model.band_progress) > 0
+        assert model.band_density.max() == 1.0
+
+    def test_view_slices_from_date(self, mock_bitcoin):
+        view = ChartModel(mock_bitcoin).view("2022-01-01")
+        assert len(view.rgba) == len(view.data)
+        assert (view.data["Date"].dt.year >= 2022).all()
+
+    def test_view_grid_starts_below_min_price(self, mock_bitcoin):
+        view = ChartModel(mock_bitcoin).view(None)
+        assert view.grid_intervals[0] >= view.r_min
+        assert view.grid_intervals[-1] == GRID_INTERVALS[-1]
+
+    def test_shared_model_is_reused_by_all_artists(self, mocker, mock_bitcoin):
+        model = ChartModel(mock_bitcoin)
+        build = mocker.patch("btc_cycles.artist.static.ChartModel")
+        for kind in ["static", "interactive"]:
+            for theme in ["light", "dark"]:
+                artist = Artist(mock_bitcoin, kind=kind, theme=theme, model=model)
+                artist.plot(from_date="2021-01-01")
+                assert artist.artist.model is model
+        build.assert_not_called()
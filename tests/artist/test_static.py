@@ -0,0 +1,21 @@
+"""test static artist"""
+
+import matplotlib.figure
+from matplotlib.container import BarContainer
+
+from btc_cycles.artist.artist import Artist
+
+
+class TestStaticArtist:
+    def test_returns_matplotlib_figure(self, mock_bitcoin):
+        artist = Artist(mock_bitcoin, kind="static", theme="light")
+        fig = artist.plot(from_date="2020-05-11")
+        assert isinstance(fig, matplotlib.figure.Figure)
+
+    def test_low_probability_band_is_single_bar_call(self, mock_bitcoin_with_lows):
+        artist = Artist(mock_bitcoin_with_lows, kind="static", theme="light")
+        artist.plot(from_date="2020-05-11")
+        bars = [c for c in artist.artist.axes.containers if isinstance(c, BarContainer)]
+        assert len(bars) == 1
+        alphas = {patch.get_facecolor()[3] for patch in bars[0]}
+        assert len(alphas) > 1
@@ -33,3 +33,34 @@ class TestProgressLabels:
         labels = ProgressLabels(mock_bitcoin).labels
         for label in labels:
             assert date_pattern.search(label), f"No date found in label: {label!r}"
+
+    def test_sparse_data_still_produces_all_labels(self, mock_bitcoin):
+        """Weekly data has no row within the tolerance of every milestone."""
+        mock_bitcoin.prices = mock_bitcoin.prices.iloc[::7].reset_index(drop=True)
+        labels = ProgressLabels(mock_bitcoin).labels
+        assert len(labels) == 4
+        assert all(label.count("-") >= 4 for label in labels)
+
+    def test_milestones_before_first_price_are_not_labelled(self, mock_bitcoin):
+        """Prices from 2023 start past the 50% progress of the cycle."""
+        prices = mock_bitcoin.prices
+        mock_bitcoin.prices = prices[prices["Date"] >= "2023-01-01"].reset_index(
+            drop=True
+        )
+        labels = ProgressLabels(mock_bitcoin).labels
+        assert "01-01-2023" not in labels[0.5]
+
+
+class TestColorBarLookup:
+    def test_hex_matches_per_value_colormap(self, mock_bitcoin):
+        import matplotlib.colors as mcolors
+
+        colorbar = ColorBar(mock_bitcoin)
+        values = mock_bitcoin.prices["distance_ath_perc"]
+        expected = [mcolors.to_hex(colorbar.cmap(colorbar.norm(x))) for x in values]
+        assert colorbar.to_hex(values).tolist() == expected
+
+    def test_rgba_has_one_row_per_value(self, mock_bitcoin):
+        colorbar = ColorBar(mock_bitcoin)
+        rgba = colorbar.to_rgba(mock_bitcoin.prices["distance_ath_perc"])
+        assert rgba.shape == (len(mock_bitcoin.prices), 4)
@@ -2,6 +2,7 @@
 
 import datetime
 
+import numpy as np
 import pandas as pd
 import pytest
 
@@ -17,3 +18,19 @@ def test_prices():
     df = pd.read_csv("tests/test_prices.csv")
     df["Date"] = pd.to_datetime(df["Date"])
     return df
+
+
+@pytest.fixture
+def raw_prices(test_prices):
+    """Test prices as served by a source, with naive UTC dates."""
+    return test_prices[["Date", "Close"]].assign(
+        Date=test_prices["Date"].dt.tz_localize(None)
+    )
+
+
+@pytest.fixture
+def daily_prices():
+    """Synthetic daily prices from 2015 to mid-2021, across a halving."""
+    dates = pd.date_range("2015-01-01", "2021-06-30", freq="D")
+    closes = 1000 + 500 * np.sin(np.arange(len(dates)) / 90.0) + np.arange(len(dates))
+    return pd.DataFrame({"Date": dates, "Close": closes})
@@ -1,12 +1,16 @@
 """test bitcoin module — behaviour tests"""
 
+import asyncio
 import datetime
+import threading
 
 import matplotlib.figure
 import pandas as pd
 import pytest
 
 from btc_cycles.core.bitcoin import Bitcoin
+from btc_cycles.core.halvings import Halvings
+from btc_cycles.core.sources import ReplaySource, Source
 from tests.conftest import MOCK_PREDICTION
 
 
@@ -17,7 +21,7 @@ def bitcoin(mocker, test_prices) -> Bitcoin:
         "btc_cycles.core.bitcoin.get_halving_data",
         return_value=MOCK_PREDICTION,
     )
-    mock_prices = mocker.MagicMock()
+    mock_prices = mocker.MagicMock(coin="BTC", currency="USD", granularity="day")
     mock_prices.data = test_prices
     mocker.patch("btc_cycles.core.bitcoin.Prices", return_value=mock_prices)
     return Bitcoin()
@@ -45,7 +49,44 @@ class TestBitcoinInit:
         mock_prices_cls.return_value.data = test_prices
         Bitcoin()
         call_kwargs = mock_prices_cls.call_args
-        assert call_kwargs.kwargs["source"] == "cryptocompare"
+        assert call_kwargs.kwargs["source"].source == "cryptocompare"
+
+    def test_halving_prediction_reuses_source_session(self, mocker, test_prices):
+        halving_data = mocker.patch(
+            "btc_cycles.core.bitcoin.get_halving_data",
+            return_value=MOCK_PREDICTION,
+        )
+        mock_prices_cls = mocker.patch("btc_cycles.core.bitcoin.Prices")
+        mock_prices_cls.return_value.data = test_prices
+        Bitcoin()
+        client = mock_prices_cls.call_args.kwargs["source"]
+        assert halving_data.call_args.kwargs["session"] is client.session
+
+
+class TestBitcoinUpdate:
+    def test_update_refreshes_prices(self, bitcoin, test_prices):
+        updated = test_prices.iloc[:-1]
+        bitcoin._prices.update.return_value = updated
+        assert bitcoin.update(test_prices.iloc[[-1]]) is updated
+        assert bitcoin.prices is updated
+
+
+class TestBitcoinChartModel:
+    def test_chart_model_is_cached(self, bitcoin):
+        assert bitcoin.chart_model is bitcoin.chart_model
+
+    def test_replaced_prices_rebuild_chart_model(self, bitcoin):
+        model = bitcoin.chart_model
+        bitcoin.prices = bitcoin.prices[bitcoin.prices["Date"] < "2024-01-01"]
+        assert bitcoin.chart_model is not model
+        assert len(bitcoin.chart_model.hex) == len(bitcoin.prices)
+        assert isinstance(bitcoin.plot(), matplotlib.figure.Figure)
+
+    def test_update_rebuilds_chart_model(self, bitcoin, test_prices):
+        model = bitcoin.chart_model
+        bitcoin._prices.update.return_value = test_prices
+        bitcoin.update(test_prices.iloc[[-1]])
+        assert bitcoin.chart_model is not model
 
 
 class TestBitcoinPlot:
@@ -56,3 +97,151 @@ class TestBitcoinPlot:
     def test_accepts_from_date(self, bitcoin):
         fig = bitcoin.plot(from_date="2023-01-01")
         assert isinstance(fig, matplotlib.figure.Figure)
+
+
+class TestBitcoinAcreate:
+    def test_fetches_prediction_and_prices_concurrently(self, mocker, raw_prices):
+        # each fetch only returns once the other one has started
+        barrier = threading.Barrier(2, timeout=5)
+
+        def get_halving_data(**kwargs):
+            barrier.wait()
+            return MOCK_PREDICTION
+
+        def get_data(self, coin, fiat):
+            barrier.wait()
+            return raw_prices
+
+        mocker.patch(
+            "btc_cycles.core.bitcoin.get_halving_data", side_effect=get_halving_data
+        )
+        mocker.patch.object(Source, "get_data", get_data)
+        bitcoin = asyncio.run(Bitcoin.acreate())
+        assert bitcoin.predicted_halving_block == MOCK_PREDICTION[1]
+        assert len(bitcoin.prices) == len(raw_prices)
+
+    def test_matches_sync_construction(self, mocker, raw_prices):
+        mocker.patch(
+            "btc_cycles.core.bitcoin.get_halving_data", return_value=MOCK_PREDICTION
+        )
+        mocker.patch.object(Source, "_fetch_cryptocompare", return_value=raw_prices)
+        pd.testing.assert_frame_equal(
+            asyncio.run(Bitcoin.acreate()).prices, Bitcoin().prices
+        )
+
+
+class TestBitcoinBatch:
+    @pytest.fixture
+    def get_data(self, mocker, raw_prices):
+        return mocker.patch.object(Source, "get_data", return_value=raw_prices)
+
+    def test_shares_prediction_and_halvings(self, mocker, get_data):
+        prediction = mocker.patch(
+            "btc_cycles.core.bitcoin.get_halving_data", return_value=MOCK_PREDICTION
+        )
+        halvings = mocker.spy(Halvings, "__init__")
+        pairs = [("BTC", "USD"), ("BTC", "EUR"), ("ETH", "USD")]
+        result = Bitcoin.batch(pairs)
+
+        prediction.assert_called_once()
+        halvings.assert_called_once()
+        assert sorted(call.args for call in get_data.call_args_list) == sorted(pairs)
+        assert list(result) == pairs
+        assert result["BTC", "EUR"].halvings is result["ETH", "USD"].halvings
+
+    def test_each_snapshot_knows_its_pair(self, mocker, get_data):
+        mocker.patch(
+            "btc_cycles.core.bitcoin.get_halving_data", return_value=MOCK_PREDICTION
+        )
+        result = Bitcoin.batch([("ETH", "GBP"), ("ETH", "GBP")])
+        assert list(result) == [("ETH", "GBP")]
+        bitcoin = result["ETH", "GBP"]
+        assert (bitcoin.coin, bitcoin.currency) == ("ETH", "GBP")
+        assert bitcoin.chart_model.pair == "ETH/GBP"
+
+
+class TestBitcoinReplay:
+    def test_replay_needs_no_network(self, mocker, tmp_path, raw_prices):
+        live = mocker.Mock(
+            spec=["get_data"], get_data=mocker.Mock(return_value=raw_prices)
+        )
+        response = mocker.MagicMock(status_code=200, headers={})
+        response.json.return_value = {
+            "target": {"predicted_timestamp": 1838300000, "block_number": "1050000"}
+        }
+        api = mocker.patch("btc_cycles.core.halvings.requests.get")
+        api.return_value = response
+        recorded = Bitcoin(source=ReplaySource(tmp_path, live, mode="record"))
+
+        api.side_effect = AssertionError("network used while replaying")
+        replayed = Bitcoin(source=ReplaySource(tmp_path))
+        pd.testing.assert_frame_equal(replayed.prices, recorded.prices)
+        assert replayed.predicted_halving_date == recorded.predicted_halving_date
+
+
+class TestBitcoinCompact:
+    @pytest.mark.parametrize("kind", ["static", "interactive"])
+    def test_compact_snapshot_plots(self, mocker, raw_prices, kind):
+        mocker.patch(
+            "btc_cycles.core.bitcoin.get_halving_data", return_value=MOCK_PREDICTION
+        )
+        mocker.patch.object(Source, "get_data", return_value=raw_prices)
+        bitcoin = Bitcoin(compact=True, price_dtype="float32")
+        assert bitcoin.prices["cycle_id"].dtype == "category"
+        assert bitcoin.plot(kind=kind) is not None
+
+
+class TestBitcoinSnapshot:
+    @pytest.fixture
+    def snapshot(self, mocker, raw_prices):
+        def build(**kwargs):
+            mocker.patch(
+                "btc_cycles.core.bitcoin.get_halving_data",
+                return_value=MOCK_PREDICTION,
+            )
+            mocker.patch.object(Source, "get_data", return_value=raw_prices)
+            return Bitcoin(**kwargs)
+
+        return build
+
+    @pytest.mark.parametrize(
+        "kwargs", [{}, {"compact": True, "price_dtype": "float32"}]
+    )
+    def test_round_trip(self, snapshot, tmp_path, kwargs):
+        bitcoin = snapshot(**kwargs)
+        bitcoin.save(tmp_path / "btc.arrow")
+        loaded = Bitcoin.load(tmp_path / "btc.arrow")
+        pd.testing.assert_frame_equal(loaded.prices, bitcoin.prices)
+        pd.testing.assert_frame_equal(loaded.halvings, bitcoin.halvings)
+        assert loaded.predicted_halving_date == bitcoin.predicted_halving_date
+        assert loaded.predicted_halving_block == bitcoin.predicted_halving_block
+        assert (loaded.coin, loaded.currency, loaded.granularity) == (
+            "BTC",
+            "USD",
+            "day",
+        )
+
+    def test_load_is_memory_mapped(self, snapshot, tmp_path):
+        snapshot().save(tmp_path / "btc.arrow")
+        loaded = Bitcoin.load(tmp_path / "btc.arrow")
+        # zero-copy columns are read-only views of the mapped file
+        assert not loaded.prices["Close"].to_numpy().flags.writeable
+
+    def test_loaded_snapshot_updates_and_plots(self, snapshot, tmp_path):
+        bitcoin = snapshot()
+        bitcoin.save(tmp_path / "btc.arrow")
+        loaded = Bitcoin.load(tmp_path / "btc.arrow")
+        candle = pd.DataFrame(
+            {
+                "Date": [bitcoin.prices["Date"].iat[-1].tz_localize(None)],
+                "Close": [1.0],
+            }
+        )
+        assert loaded.update(candle)["Close"].iat[-1] == 1.0
+        assert isinstance(loaded.plot(), matplotlib.figure.Figure)
+
+    def test_load_rejects_other_files(self, tmp_path, test_prices):
+        path = tmp_path / "prices.arrow"
+        test_prices.to_feather(path)
+        with pytest.raises(ValueError):
+            Bitcoin.load(path)
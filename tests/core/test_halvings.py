@@ -63,6 +63,16 @@ class TestGetHalvingData:
         assert date.tzinfo is not None
         assert block == 1050000
 
+    def test_uses_given_session(self, mocker):
+        requests_get = mocker.patch("btc_cycles.core.halvings.requests.get")
+        session = mocker.MagicMock()
+        session.get.return_value.json.return_value = {
+            "target": {"predicted_timestamp": 1838300000, "block_number": "1050000"}
+        }
+        assert get_halving_data(session=session)[1] == 1050000
+        session.get.assert_called_once()
+        requests_get.assert_not_called()
+
     def test_raises_on_network_failure(self, mocker):
         import requests
 
@@ -82,3 +92,65 @@ class TestGetHalvingData:
         )
         with pytest.raises(HalvingAPIError):
             get_halving_data()
+
+
+class TestHalvingPredictionCache:
+    @pytest.fixture
+    def api(self, mocker):
+        response = mocker.MagicMock()
+        response.status_code = 200
+        response.headers = {"ETag": '"abc"'}
+        response.json.return_value = {
+            "target": {
+                "predicted_timestamp": 1838300000,
+                "block_number": "1050000",
+            }
+        }
+        return mocker.patch(
+            "btc_cycles.core.halvings.requests.get",
+            return_value=response,
+        )
+
+    def test_fresh_cache_skips_request(self, tmp_path, api):
+        first = get_halving_data(cache_dir=tmp_path)
+        second = get_halving_data(cache_dir=tmp_path)
+        assert api.call_count == 1
+        assert first == second
+
+    def test_stale_cache_revalidates_with_etag(self, tmp_path, api):
+        get_halving_data(cache_dir=tmp_path)
+        api.return_value.status_code = 304
+        date, block = get_halving_data(cache_dir=tmp_path, ttl=0)
+        assert api.call_args.kwargs["headers"]["If-None-Match"] == '"abc"'
+        assert block == 1050000
+
+    def test_falls_back_to_cache_when_api_down(self, tmp_path, api):
+        import requests
+
+        expected = get_halving_data(cache_dir=tmp_path)
+        api.side_effect = requests.Timeout("slow")
+        with pytest.warns(UserWarning, match="cached halving prediction"):
+            assert get_halving_data(cache_dir=tmp_path, ttl=0) == expected
+
+    def test_timed_out_request_is_instrumented(self, tmp_path, api):
+        import requests
+
+        from btc_cycles.instrumentation import instrument
+
+        get_halving_data(cache_dir=tmp_path)
+        api.side_effect = requests.Timeout("slow")
+        with instrument() as records, pytest.warns(UserWarning):
+            get_halving_data(cache_dir=tmp_path, ttl=0)
+        assert [(r.stage, r.error) for r in records] == [
+            ("halving_api", "Timeout: slow")
+        ]
+
+    def test_offline_uses_cache_without_request(self, tmp_path, api):
+        expected = get_halving_data(cache_dir=tmp_path)
+        assert get_halving_data(cache_dir=tmp_path, ttl=0, offline=True) == expected
+        assert api.call_count == 1
+
+    def test_offline_without_cache_raises(self, tmp_path, api):
+        with pytest.raises(HalvingAPIError):
+            get_halving_data(cache_dir=tmp_path, offline=True)
+        api.assert_not_called()
@@ -1,9 +1,17 @@
 """test prices module — behaviour tests for price metric functions"""
 
+import numpy as np
 import pandas as pd
 import pytest
 
-from btc_cycles.core.prices import _find_ath, _find_cycle_lows, _find_cycle_progress
+from btc_cycles.core.halvings import Halvings
+from btc_cycles.core.prices import (
+    Prices,
+    _find_ath,
+    _find_cycle_lows,
+    _find_cycle_progress,
+)
+from tests.conftest import MOCK_PREDICTION
 
 
 @pytest.fixture
@@ -100,6 +108,20 @@ class TestFindCycleLows:
         result = _find_cycle_lows(df)
         assert not result["is_cycle_low"].any()
 
+    def test_second_low_requires_separation(self):
+        """A second low is only flagged when far enough from the first."""
+        df = pd.DataFrame(
+            {
+                "Date": pd.to_datetime(
+                    ["2014-01-01", "2014-02-01", "2014-12-01", "2017-01-01"]
+                ),
+                "cycle_id": [1, 1, 1, 2],
+                "distance_ath_perc": [-0.9, -0.8, -0.7, 0.0],
+            }
+        )
+        result = _find_cycle_lows(df, min_separation_days=90)
+        assert result["is_cycle_low"].tolist() == [True, False, True, False]
+
 
 class TestFindCycleProgress:
     def test_progress_at_halving_is_zero(self):
@@ -130,3 +152,169 @@ class TestFindCycleProgress:
         result = _find_cycle_progress(df)
         expected = (pd.Timestamp("2022-05-01") - pd.Timestamp("2020-05-11")).days / 1440
         assert abs(result.loc[0, "cycle_progress"] - expected) < 0.001
+
+    def test_hourly_progress_counts_whole_hours(self):
+        df = pd.DataFrame(
+            {
+                "Date": pd.to_datetime(["2020-05-11 06:00", "2020-05-11 06:59"]),
+                "Halving": pd.to_datetime(["2020-05-11", "2020-05-11"]),
+                "cycle_length": [1440, 1440],
+            }
+        )
+        daily = _find_cycle_progress(df.copy())["cycle_progress"]
+        hourly = _find_cycle_progress(df, unit=pd.Timedelta(hours=1))["cycle_progress"]
+        assert daily.tolist() == [0.0, 0.0]
+        assert hourly.tolist() == [0.25 / 1440, 0.25 / 1440]
+
+
+class TestPricesFormat:
+    @pytest.fixture
+    def prices(self, mocker):
+        raw = pd.DataFrame(
+            {
+                "Date": pd.to_datetime(
+                    ["2024-04-20", "2012-11-28", "2016-07-08", "2020-05-11"]
+                ),
+                "Close": [64000.0, 12.0, 650.0, 8500.0],
+            }
+        )
+        mocker.patch("btc_cycles.core.prices.Source").return_value.get_data = (
+            mocker.MagicMock(return_value=raw)
+        )
+        halvings = Halvings(prediction=MOCK_PREDICTION).data
+        return Prices(
+            currency="USD", source="cryptocompare", api_key=None, halvings=halvings
+        ).data
+
+    def test_rows_sorted_by_date(self, prices):
+        assert prices["Date"].is_monotonic_increasing
+
+    def test_rows_assigned_to_latest_halving_on_or_before(self, prices):
+        assert prices["block"].tolist() == [210000, 210000, 630000, 630000]
+        assert prices["cycle_id"].tolist() == [2, 2, 4, 4]
+
+    def test_halving_date_matches_cycle(self, prices):
+        assert prices["Halving"].iloc[0] == pd.Timestamp("2012-11-28", tz="UTC")
+        assert prices["Halving"].iloc[-1] == pd.Timestamp("2020-05-11", tz="UTC")
+
+    def test_given_data_is_not_fetched(self, mocker):
+        source = mocker.patch("btc_cycles.core.prices.Source")
+        raw = pd.DataFrame(
+            {"Date": pd.to_datetime(["2020-05-12"]), "Close": [8600.0]}
+        )
+        prices = Prices(
+            currency="USD",
+            source="cryptocompare",
+            api_key=None,
+            halvings=Halvings(prediction=MOCK_PREDICTION).data,
+            data=raw,
+        )
+        source.assert_not_called()
+        assert prices.data["cycle_id"].tolist() == [4]
+
+    def test_source_instance_is_used(self, mocker):
+        raw = pd.DataFrame(
+            {"Date": pd.to_datetime(["2020-05-12"]), "Close": [8600.0]}
+        )
+        source = mocker.Mock(spec=["get_data"], get_data=mocker.Mock(return_value=raw))
+        prices = Prices(
+            currency="EUR",
+            source=source,
+            api_key=None,
+            halvings=Halvings(prediction=MOCK_PREDICTION).data,
+        )
+        source.get_data.assert_called_once_with("BTC", "EUR")
+        assert len(prices.data) == 1
+
+
+class TestPricesUpdate:
+    @staticmethod
+    def _prices(mocker, data):
+        mocker.patch("btc_cycles.core.prices.Source").return_value.get_data = (
+            mocker.MagicMock(return_value=data)
+        )
+        halvings = Halvings(prediction=MOCK_PREDICTION).data
+        return Prices(
+            currency="USD", source="cryptocompare", api_key=None, halvings=halvings
+        )
+
+    def test_matches_full_build_across_cycle_close(self, mocker, daily_prices):
+        """Appending candles past a halving gives the same frame as a rebuild."""
+        expected = self._prices(mocker, daily_prices).data
+        prices = self._prices(mocker, daily_prices[daily_prices["Date"] < "2020-01-01"])
+        prices.update(daily_prices[daily_prices["Date"] >= "2020-01-01"].iloc[:200])
+        result = prices.update(
+            daily_prices[daily_prices["Date"] >= "2020-01-01"].iloc[200:]
+        )
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_same_date_replaces_last_candle(self, mocker, daily_prices):
+        prices = self._prices(mocker, daily_prices)
+        last = daily_prices.iloc[[-1]].assign(Close=1e6)
+        result = prices.update(last)
+        assert len(result) == len(daily_prices)
+        assert result["Close"].iloc[-1] == 1e6
+        assert result["ATH"].iloc[-1] == 1e6
+
+    def test_older_candle_raises(self, mocker, daily_prices):
+        prices = self._prices(mocker, daily_prices)
+        with pytest.raises(ValueError):
+            prices.update(daily_prices.iloc[[0]])
+
+    def test_candle_between_last_two_raises(self, mocker, daily_prices):
+        prices = self._prices(mocker, daily_prices)
+        between = daily_prices.iloc[[-2]].assign(
+            Date=daily_prices["Date"].iat[-2] + pd.Timedelta(hours=12)
+        )
+        with pytest.raises(ValueError):
+            prices.update(between)
+        assert len(prices.data) == len(daily_prices)
+
+
+class TestPricesCompact:
+    @staticmethod
+    def _prices(data, **kwargs):
+        return Prices(
+            currency="USD",
+            source="cryptocompare",
+            api_key=None,
+            halvings=Halvings(prediction=MOCK_PREDICTION).data,
+            data=data,
+            **kwargs,
+        )
+
+    def test_metrics_match_default_layout(self, daily_prices):
+        expected = self._prices(daily_prices).data
+        result = self._prices(daily_prices, compact=True).data
+        assert not {"Halving", "block", "reward", "cycle_length"} & set(result)
+        np.testing.assert_array_equal(
+            result["cycle_id"].to_numpy(dtype=float), expected["cycle_id"]
+        )
+        pd.testing.assert_frame_equal(
+            result.drop(columns="cycle_id"), expected[result.columns.drop("cycle_id")]
+        )
+
+    def test_cycle_codes_reference_halvings(self, daily_prices):
+        prices = self._prices(daily_prices, compact=True)
+        codes = prices.data["cycle_id"].cat.codes
+        assert codes.dtype == np.int8
+        assert (
+            prices.halvings["cycle_id"].to_numpy()[codes] == prices.data["cycle_id"]
+        ).all()
+
+    def test_float32_prices_use_fewer_bytes(self, daily_prices):
+        default = self._prices(daily_prices).data
+        compact = self._prices(daily_prices, compact=True, price_dtype="float32").data
+        assert compact["Close"].dtype == np.float32
+        assert compact["cycle_progress"].dtype == np.float32
+        assert compact.memory_usage().sum() * 3 < default.memory_usage().sum()
+
+    def test_update_keeps_layout(self, daily_prices):
+        expected = self._prices(daily_prices, compact=True, price_dtype="float32").data
+        prices = self._prices(
+            daily_prices[daily_prices["Date"] < "2020-01-01"],
+            compact=True,
+            price_dtype="float32",
+        )
+        result = prices.update(daily_prices[daily_prices["Date"] >= "2020-01-01"])
+        pd.testing.assert_frame_equal(result, expected)
@@ -0,0 +1,586 @@
+"""test sources module — behaviour tests"""
+
+import datetime as dt
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from btc_cycles.core.sources import (
+    DataSourceError,
+    FileSource,
+    HedgedSource,
+    PriceCache,
+    PriceStore,
+    ReplaySource,
+    Source,
+)
+from btc_cycles.core.sources.paging import (
+    TokenBucket,
+    fetch_pages,
+    plan_windows,
+    stitch_pages,
+)
+from btc_cycles.core.sources.source import START
+
+DAY = 24 * 60 * 60
+
+
+def _prices(dates, closes):
+    return pd.DataFrame({"Date": pd.to_datetime(dates), "Close": closes})
+
+
+@pytest.fixture
+def fetch(mocker):
+    """Patch the cryptocompare fetcher, recording the requested start."""
+    return mocker.patch.object(
+        Source,
+        "_fetch_cryptocompare",
+        return_value=_prices(["2024-01-01", "2024-01-02"], [100.0, 110.0]),
+    )
+
+
+def _histoday(coin, currency="USD", limit=2000, toTs=0, **kwargs):
+    """Daily history page ending on the day of `toTs`, like cryptocompare."""
+    last = toTs // DAY * DAY
+    return [
+        {"time": last - i * DAY, "open": 1.0, "close": 1.0 + i}
+        for i in range(limit, -1, -1)
+    ]
+
+
+class TestPriceCache:
+    def test_missing_key_loads_none(self, tmp_path):
+        assert PriceCache(tmp_path).load("cryptocompare", "BTC", "USD") is None
+
+    def test_save_and_load_round_trip(self, tmp_path):
+        cache = PriceCache(tmp_path)
+        data = _prices(["2024-01-01"], [100.0])
+        cache.save("cryptocompare", "BTC", "USD", data)
+        pd.testing.assert_frame_equal(
+            cache.load("cryptocompare", "BTC", "USD"), data
+        )
+
+    def test_keys_are_independent(self, tmp_path):
+        cache = PriceCache(tmp_path)
+        cache.save("cryptocompare", "BTC", "USD", _prices(["2024-01-01"], [1.0]))
+        assert cache.load("cryptocompare", "BTC", "EUR") is None
+
+    def test_update_replaces_overlapping_days(self, tmp_path):
+        cache = PriceCache(tmp_path)
+        cached = _prices(["2024-01-01", "2024-01-02"], [100.0, 105.0])
+        fetched = _prices(["2024-01-02", "2024-01-03"], [110.0, 120.0])
+        merged = cache.update("cryptocompare", "BTC", "USD", cached, fetched)
+        assert merged["Close"].tolist() == [100.0, 110.0, 120.0]
+        assert merged["Date"].is_monotonic_increasing
+
+    def test_concurrent_saves_of_a_key(self, tmp_path):
+        cache = PriceCache(tmp_path)
+        barrier = threading.Barrier(4, timeout=5)
+        errors = []
+
+        def save(close):
+            barrier.wait()
+            try:
+                for _ in range(20):
+                    data = _prices(["2024-01-01"], [close])
+                    cache.save("cryptocompare", "BTC", "USD", data)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=save, args=(float(i),)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert errors == []
+        assert cache.load("cryptocompare", "BTC", "USD")["Close"].iat[0] in range(4)
+        assert [p.name for p in tmp_path.iterdir()] == ["cryptocompare-btc-usd.parquet"]
+
+
+class TestSourceCache:
+    def test_cold_cache_fetches_full_history(self, tmp_path, fetch):
+        Source("cryptocompare", cache=tmp_path).get_data("BTC", "USD")
+        assert fetch.call_args.args[2] == START
+
+    def test_warm_cache_fetches_from_last_cached_date(self, tmp_path, fetch):
+        PriceCache(tmp_path).save(
+            "cryptocompare", "BTC", "USD", _prices(["2023-12-31"], [90.0])
+        )
+        data = Source("cryptocompare", cache=tmp_path).get_data("BTC", "USD")
+        assert fetch.call_args.args[2] == pd.Timestamp("2023-12-31")
+        assert data["Close"].tolist() == [90.0, 100.0, 110.0]
+
+    def test_fetched_prices_are_cached(self, tmp_path, fetch):
+        Source("cryptocompare", cache=tmp_path).get_data("BTC", "USD")
+        cached = PriceCache(tmp_path).load("cryptocompare", "BTC", "USD")
+        assert len(cached) == 2
+
+    def test_offline_serves_cache_without_fetching(self, tmp_path, fetch):
+        PriceCache(tmp_path).save(
+            "cryptocompare", "BTC", "USD", _prices(["2023-12-31"], [90.0])
+        )
+        data = Source("cryptocompare", cache=tmp_path, offline=True).get_data(
+            "BTC", "USD"
+        )
+        fetch.assert_not_called()
+        assert data["Close"].tolist() == [90.0]
+
+    def test_offline_without_cached_data_raises(self, tmp_path, fetch):
+        with pytest.raises(DataSourceError):
+            Source("cryptocompare", cache=tmp_path, offline=True).get_data(
+                "BTC", "USD"
+            )
+
+    def test_offline_without_cache_raises(self):
+        with pytest.raises(ValueError):
+            Source("cryptocompare", offline=True)
+
+    def test_intraday_prices_are_cached_apart(self, tmp_path, fetch):
+        Source("cryptocompare", cache=tmp_path, granularity="hour").get_data(
+            "BTC", "USD"
+        )
+        cache = PriceCache(tmp_path)
+        assert cache.load("cryptocompare", "BTC", "USD") is None
+        assert len(cache.load("cryptocompare-hour", "BTC", "USD")) == 2
+
+    def test_unavailable_granularity_raises(self):
+        with pytest.raises(ValueError):
+            Source("cryptocompare", granularity="second")
+        with pytest.raises(ValueError):
+            Source("coinmarketcap", granularity="hour")
+
+
+class TestCoinmarketcapFree:
+    def test_deprecation_warning_points_at_caller(self, mocker):
+        mocker.patch.dict("sys.modules", {"cryptocmd": mocker.MagicMock()})
+        with pytest.warns(UserWarning, match="coinmarketcap-free") as record:
+            try:
+                Source("coinmarketcap-free").get_data("BTC", "USD")
+            except DataSourceError:
+                pass
+        assert record[0].filename == __file__
+
+
+class TestPriceStore:
+    def test_save_and_load_round_trip(self, tmp_path):
+        store = PriceStore(tmp_path)
+        data = _prices(["2024-01-01", "2024-01-02"], [100.0, 110.0])
+        store.save("cryptocompare", "BTC", "USD", data)
+        pd.testing.assert_frame_equal(store.load("cryptocompare", "BTC", "USD"), data)
+        assert store.load("cryptocompare", "BTC", "EUR") is None
+        assert store.keys() == ["cryptocompare-btc-usd"]
+
+    def test_loaded_columns_are_memory_mapped(self, tmp_path):
+        store = PriceStore(tmp_path)
+        store.save("cryptocompare", "BTC", "USD", _prices(["2024-01-01"], [1.0]))
+        data = store.load("cryptocompare", "BTC", "USD")
+        assert not data["Close"].to_numpy().flags.writeable
+
+    def test_update_only_writes_the_tail(self, tmp_path):
+        store = PriceStore(tmp_path)
+        cached = _prices(["2023-12-30", "2023-12-31"], [80.0, 90.0])
+        store.save("cryptocompare", "BTC", "USD", cached)
+        path = tmp_path / "cryptocompare-btc-usd.Close.bin"
+        head = path.read_bytes()[:8]
+        data = store.update(
+            "cryptocompare",
+            "BTC",
+            "USD",
+            store.load("cryptocompare", "BTC", "USD"),
+            _prices(["2023-12-31", "2024-01-01"], [95.0, 100.0]),
+        )
+        assert data["Close"].tolist() == [80.0, 95.0, 100.0]
+        assert path.read_bytes()[:8] == head
+        # another reader of the directory sees the update
+        reloaded = PriceStore(tmp_path).load("cryptocompare", "BTC", "USD")
+        pd.testing.assert_frame_equal(reloaded, data)
+
+    def test_source_uses_store_as_cache(self, tmp_path, fetch):
+        store = PriceStore(tmp_path)
+        store.save("cryptocompare", "BTC", "USD", _prices(["2023-12-31"], [90.0]))
+        data = Source("cryptocompare", cache=store).get_data("BTC", "USD")
+        assert fetch.call_args.args[2] == pd.Timestamp("2023-12-31")
+        assert data["Close"].tolist() == [90.0, 100.0, 110.0]
+
+    def test_stores_any_columns(self, tmp_path):
+        data = pd.DataFrame(
+            {
+                "Date": pd.date_range("2024-01-01", periods=3, tz="UTC"),
+                "Close": np.array([1.0, 2.0, 3.0], dtype="float32"),
+                "cycle_id": pd.Categorical.from_codes([0, 1, -1], categories=[4, 5]),
+                "is_cycle_low": [False, True, False],
+            }
+        )
+        store = PriceStore(tmp_path)
+        store.write("metrics", data.iloc[:2])
+        store.write("metrics", data.iloc[2:])
+        pd.testing.assert_frame_equal(store.read("metrics"), data)
+        with pytest.raises(ValueError):
+            store.write("metrics", data[["Date", "Close"]])
+        with pytest.raises(TypeError):
+            store.write("names", pd.DataFrame({"name": ["a"]}))
+
+
+class TestPaging:
+    def test_windows_cover_range_without_gaps(self):
+        start, end = dt.datetime(2010, 7, 17), dt.datetime(2024, 1, 1)
+        windows = plan_windows(start, end, limit=100)
+        pages = [_histoday("BTC", limit=100, toTs=to_ts) for to_ts in windows]
+        data = stitch_pages(pages, start)
+        expected = pd.date_range(start, end, freq="D")
+        assert data["Date"].tolist() == expected.tolist()
+
+    def test_stitch_drops_placeholders_and_duplicates(self):
+        pages = [
+            [{"time": 2 * DAY, "open": 1.0, "close": 3.0}],
+            [
+                {"time": 0, "open": 0, "close": 0},
+                {"time": DAY, "open": 1.0, "close": 2.0},
+                {"time": 2 * DAY, "open": 1.0, "close": 4.0},
+            ],
+        ]
+        data = stitch_pages(pages, dt.datetime(1970, 1, 1))
+        assert data["Close"].tolist() == [2.0, 4.0]
+
+    def test_failed_page_is_retried(self, mocker):
+        fetch_page = mocker.Mock(side_effect=[None, None, [{"time": 0}]])
+        pages = fetch_pages(fetch_page, [0], retries=2, backoff=0)
+        assert pages == [[{"time": 0}]]
+        assert fetch_page.call_count == 3
+
+    def test_page_error_is_not_retried(self, mocker):
+        fetch_page = mocker.Mock(side_effect=DataSourceError("invalid pair"))
+        with pytest.raises(DataSourceError):
+            fetch_pages(fetch_page, [0], retries=2, backoff=0)
+        fetch_page.assert_called_once()
+
+    def test_page_failing_all_retries_raises(self, mocker):
+        fetch_page = mocker.Mock(return_value=None)
+        with pytest.raises(RuntimeError):
+            fetch_pages(fetch_page, [0], retries=2, backoff=0)
+        assert fetch_page.call_count == 3
+
+    def test_token_bucket_limits_rate(self):
+        bucket = TokenBucket(rate=50, capacity=1)
+        started = time.monotonic()
+        for _ in range(6):
+            bucket.acquire()
+        assert time.monotonic() - started >= 0.09
+
+
+def _response(mocker, payload, status_code=200):
+    return mocker.Mock(status_code=status_code, content=b"{}", json=lambda: payload)
+
+
+class TestCryptocompare:
+    @staticmethod
+    def _source(mocker, responses=None, **kwargs):
+        """Source whose session serves histoday pages, or the given responses."""
+        source = Source("cryptocompare", **kwargs)
+
+        def get(url, params, headers, timeout):
+            page = _histoday(params["fsym"], params["tsym"], **params)
+            return _response(mocker, {"Response": "Success", "Data": {"Data": page}})
+
+        if responses is None:
+            source.session.get = mocker.Mock(side_effect=get)
+        else:
+            source.session.get = mocker.Mock(side_effect=responses)
+        return source
+
+    def test_history_is_paged(self, mocker):
+        source = self._source(mocker, max_workers=2)
+        data = source._fetch_cryptocompare("BTC", "USD", START)
+        assert source.session.get.call_count > 1
+        assert data["Date"].iloc[0] == START
+        assert data["Date"].is_unique
+        assert (data["Date"].diff().dropna() == pd.Timedelta(days=1)).all()
+
+    def test_api_key_is_sent_per_source(self, mocker):
+        first = self._source(mocker, api_key="first")
+        second = self._source(mocker, api_key="second")
+        first._fetch_cryptocompare("BTC", "USD", dt.datetime(2024, 1, 1))
+        second._fetch_cryptocompare("BTC", "USD", dt.datetime(2024, 1, 1))
+        assert first.session is not second.session
+        headers = first.session.get.call_args.kwargs["headers"]
+        assert headers == {"authorization": "Apikey first"}
+        headers = second.session.get.call_args.kwargs["headers"]
+        assert headers == {"authorization": "Apikey second"}
+
+    def test_rate_limited_page_is_retried(self, mocker):
+        mocker.patch("btc_cycles.core.sources.paging.time.sleep")
+        page = {"Response": "Success", "Data": {"Data": _histoday("BTC", toTs=DAY)}}
+        source = self._source(
+            mocker,
+            responses=[
+                _response(mocker, {}, status_code=429),
+                _response(
+                    mocker,
+                    {"Response": "Error", "Message": "You are over your rate limit"},
+                ),
+                _response(mocker, page),
+            ],
+        )
+        mocker.patch(
+            "btc_cycles.core.sources.source.plan_windows", return_value=[DAY]
+        )
+        data = source._fetch_cryptocompare("BTC", "USD", dt.datetime(1970, 1, 1))
+        assert source.session.get.call_count == 3
+        assert len(data) == 2
+
+    @pytest.mark.parametrize(
+        "granularity, endpoint, step",
+        [("hour", "histohour", 3600), ("minute", "histominute", 60)],
+    )
+    def test_intraday_history(self, mocker, granularity, endpoint, step):
+        source = Source("cryptocompare", granularity=granularity)
+
+        def get(url, params, headers, timeout):
+            last = params["toTs"] // step * step
+            page = [
+                {"time": last - i * step, "open": 1.0, "close": 1.0}
+                for i in range(params["limit"], -1, -1)
+            ]
+            return _response(mocker, {"Response": "Success", "Data": {"Data": page}})
+
+        source.session.get = mocker.Mock(side_effect=get)
+        # the minute history is capped, hours are requested for a month
+        start = START
+        if granularity == "hour":
+            start = dt.datetime.now() - dt.timedelta(days=30)
+        data = source._fetch_cryptocompare("BTC", "USD", start)
+        assert source.session.get.call_args.args[0].endswith(endpoint)
+        assert (data["Date"].diff().dropna() == pd.Timedelta(seconds=step)).all()
+        if granularity == "minute":
+            # only the last week of minute prices is requested
+            assert source.session.get.call_count == 6
+            assert data["Date"].iloc[0] > pd.Timestamp.now() - pd.Timedelta(days=8)
+
+    def test_api_error_raises(self, mocker):
+        source = self._source(
+            mocker,
+            responses=[
+                _response(mocker, {"Response": "Error", "Message": "invalid fsym"})
+            ],
+        )
+        with pytest.raises(DataSourceError, match="invalid fsym"):
+            source._fetch_cryptocompare("XXX", "USD", dt.datetime(2024, 1, 1))
+
+
+def _fake_source(mocker, name, data=None, gate=None, error=None, offline=False):
+    """Source answering with `data` or `error`, once `gate` is set if given."""
+
+    def get_data(coin, fiat):
+        if gate is not None:
+            assert gate.wait(timeout=5)
+        if error is not None:
+            raise error
+        return data
+
+    return mocker.Mock(
+        source=name, offline=offline, get_data=mocker.Mock(side_effect=get_data)
+    )
+
+
+def _wait_for(condition):
+    """Wait until a background fetch has updated the statistics."""
+    ready = threading.Event()
+    for _ in range(500):
+        if condition():
+            return
+        ready.wait(0.01)
+    raise AssertionError("condition not met")
+
+
+class TestHedgedSource:
+    @pytest.fixture
+    def primary_data(self):
+        return _prices(["2024-01-01"], [1.0])
+
+    @pytest.fixture
+    def secondary_data(self):
+        return _prices(["2024-01-01"], [2.0])
+
+    def test_fast_primary_is_not_hedged(self, mocker, primary_data, secondary_data):
+        primary = _fake_source(mocker, "primary", primary_data)
+        secondary = _fake_source(mocker, "secondary", secondary_data)
+        data = HedgedSource([primary, secondary], hedge_delay=10).get_data("BTC", "USD")
+        assert data is primary_data
+        secondary.get_data.assert_not_called()
+
+    def test_slow_primary_is_hedged(self, mocker, primary_data, secondary_data):
+        # the primary only answers once the test is over
+        gate = threading.Event()
+        primary = _fake_source(mocker, "primary", primary_data, gate=gate)
+        secondary = _fake_source(mocker, "secondary", secondary_data)
+        try:
+            data = HedgedSource([primary, secondary], hedge_delay=0.05).get_data(
+                "BTC", "USD"
+            )
+        finally:
+            gate.set()
+        assert data is secondary_data
+
+    def test_failing_primary_falls_back_at_once(self, mocker, secondary_data):
+        primary = _fake_source(mocker, "primary", error=DataSourceError("down"))
+        secondary = _fake_source(mocker, "secondary", secondary_data)
+        source = HedgedSource([primary, secondary], hedge_delay=10)
+        assert source.get_data("BTC", "USD") is secondary_data
+        assert source.stats[0].errors == 1
+        assert source.ranked() == [1, 0]
+
+    def test_empty_result_is_not_valid(self, mocker, secondary_data):
+        primary = _fake_source(mocker, "primary", _prices([], []))
+        secondary = _fake_source(mocker, "secondary", secondary_data)
+        source = HedgedSource([primary, secondary], hedge_delay=10)
+        assert source.get_data("BTC", "USD") is secondary_data
+
+    def test_all_failing_raises(self, mocker):
+        sources = [
+            _fake_source(mocker, name, error=DataSourceError("down"))
+            for name in ["first", "second"]
+        ]
+        with pytest.raises(DataSourceError, match="first: down; second: down"):
+            HedgedSource(sources, hedge_delay=10).get_data("BTC", "USD")
+
+    def test_fastest_source_becomes_primary(self, mocker, primary_data, secondary_data):
+        gate = threading.Event()
+        primary = _fake_source(mocker, "primary", primary_data, gate=gate)
+        secondary = _fake_source(mocker, "secondary", secondary_data)
+        source = HedgedSource([primary, secondary], hedge_delay=0.05)
+        assert source.get_data("BTC", "USD") is secondary_data
+        # the slow primary completes in the background
+        gate.set()
+        _wait_for(lambda: source.stats[0].updated is not None)
+        assert source.stats[0].latency > source.stats[1].latency
+        assert source.ranked() == [1, 0]
+        assert source.get_data("BTC", "USD") is secondary_data
+
+    def test_offline_source_is_only_a_fallback(self, mocker, primary_data):
+        gate = threading.Event()
+        remote = _fake_source(mocker, "remote", primary_data, gate=gate)
+        cached = _prices(["2023-12-31"], [0.5])
+        cache = _fake_source(mocker, "cache", cached, offline=True)
+        source = HedgedSource([remote, cache], hedge_delay=0.05)
+        # the remote is slow once, the cache answers
+        assert source.get_data("BTC", "USD") is cached
+        gate.set()
+        _wait_for(lambda: source.stats[0].updated is not None)
+        assert source.stats[0].latency > source.stats[1].latency
+        # the remote is queried first and answers before any hedge
+        source.hedge_delay = 10
+        for _ in range(5):
+            assert source.get_data("BTC", "USD") is primary_data
+        assert remote.get_data.call_count == 6
+        cache.get_data.assert_called_once()
+        assert source.ranked() == [0, 1]
+
+    def test_stale_source_is_probed(self, mocker, primary_data, secondary_data):
+        primary = _fake_source(mocker, "primary", error=DataSourceError("down"))
+        secondary = _fake_source(mocker, "secondary", secondary_data)
+        source = HedgedSource([primary, secondary], hedge_delay=10, probe_interval=60)
+        source.get_data("BTC", "USD")
+        assert source.ranked() == [1, 0]
+        # the primary recovered; its error is older than the probe interval
+        primary.get_data.side_effect = None
+        primary.get_data.return_value = primary_data
+        source.stats[0].updated -= 60
+        assert source.ranked() == [0, 1]
+        assert source.get_data("BTC", "USD") is primary_data
+
+    def test_granularity_is_that_of_the_primary(self, mocker):
+        primary = mocker.Mock(granularity="hour")
+        secondary = mocker.Mock(granularity="hour")
+        assert HedgedSource([primary, secondary]).granularity == "hour"
+
+    def test_requires_a_source(self):
+        with pytest.raises(ValueError):
+            HedgedSource([])
+
+
+class TestFileSource:
+    @pytest.mark.parametrize("suffix", [".csv", ".parquet", ".arrow"])
+    def test_reads_supported_formats(self, tmp_path, suffix):
+        data = _prices(["2024-01-01", "2024-01-02"], [100.0, 110.0])
+        path = tmp_path / f"btc-usd{suffix}"
+        {
+            ".csv": lambda: data.to_csv(path, index=False),
+            ".parquet": lambda: data.to_parquet(path),
+            ".arrow": lambda: data.to_feather(path),
+        }[suffix]()
+        result = FileSource(path).get_data("BTC", "USD")
+        pd.testing.assert_frame_equal(result, data, check_dtype=False)
+
+    def test_path_template_selects_pair(self, tmp_path):
+        _prices(["2024-01-01"], [90.0]).to_parquet(tmp_path / "BTC-EUR.parquet")
+        source = FileSource(tmp_path / "{coin}-{fiat}.parquet")
+        assert source.get_data("BTC", "EUR")["Close"].tolist() == [90.0]
+
+    def test_aware_dates_become_naive_utc(self, tmp_path):
+        data = pd.DataFrame(
+            {
+                "Date": pd.to_datetime(["2024-01-01 01:00"]).tz_localize(
+                    "Europe/Rome"
+                ),
+                "Close": [1.0],
+            }
+        )
+        data.to_parquet(tmp_path / "prices.parquet")
+        result = FileSource(tmp_path / "prices.parquet").get_data("BTC", "USD")
+        assert result["Date"].iloc[0] == pd.Timestamp("2024-01-01 00:00")
+
+    def test_missing_file_raises(self, tmp_path):
+        with pytest.raises(DataSourceError):
+            FileSource(tmp_path / "missing.csv").get_data("BTC", "USD")
+
+    def test_missing_column_raises(self, tmp_path):
+        path = tmp_path / "prices.csv"
+        pd.DataFrame({"Time": ["2024-01-01"], "Close": [1.0]}).to_csv(path, index=False)
+        with pytest.raises(DataSourceError):
+            FileSource(path).get_data("BTC", "USD")
+
+    def test_granularity(self, tmp_path):
+        assert FileSource(tmp_path / "prices.csv").granularity == "day"
+        assert FileSource(tmp_path / "prices.csv", "hour").granularity == "hour"
+        with pytest.raises(ValueError):
+            FileSource(tmp_path / "prices.csv", "week")
+
+    def test_unsupported_format_raises(self):
+        with pytest.raises(ValueError):
+            FileSource("prices.xlsx")
+
+
+class TestReplaySource:
+    def test_replays_recorded_prices(self, tmp_path, mocker):
+        data = _prices(["2024-01-01", "2024-01-02"], [100.0, 110.0])
+        live = mocker.Mock(spec=["get_data"], get_data=mocker.Mock(return_value=data))
+        ReplaySource(tmp_path, live, mode="record").get_data("BTC", "USD")
+        replayed = ReplaySource(tmp_path).get_data("BTC", "USD")
+        pd.testing.assert_frame_equal(replayed, data)
+        live.get_data.assert_called_once()
+
+    def test_granularities_are_recorded_apart(self, tmp_path, mocker):
+        daily = _prices(["2024-01-01"], [100.0])
+        hourly = _prices(["2024-01-01 00:00", "2024-01-01 01:00"], [100.0, 101.0])
+        for data, granularity in [(daily, "day"), (hourly, "hour")]:
+            live = mocker.Mock(
+                granularity=granularity, get_data=mocker.Mock(return_value=data)
+            )
+            recorder = ReplaySource(tmp_path, live, mode="record")
+            assert recorder.granularity == granularity
+            recorder.get_data("BTC", "USD")
+        replayed = ReplaySource(tmp_path).get_data("BTC", "USD")
+        pd.testing.assert_frame_equal(replayed, daily)
+        replayed = ReplaySource(tmp_path, granularity="hour").get_data("BTC", "USD")
+        pd.testing.assert_frame_equal(replayed, hourly)
+
+    def test_replaying_unrecorded_pair_raises(self, tmp_path):
+        with pytest.raises(DataSourceError):
+            ReplaySource(tmp_path).get_data("BTC", "USD")
+
+    def test_recording_requires_source(self, tmp_path):
+        with pytest.raises(ValueError):
+            ReplaySource(tmp_path, mode="record")
@@ -0,0 +1,117 @@
+"""test streaming metrics module — chunked results match the in-memory ones"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from btc_cycles.core.halvings import Halvings
+from btc_cycles.core.prices import Prices
+from btc_cycles.core.stream import MetricsStream, read_chunks, stream_metrics
+from tests.conftest import MOCK_PREDICTION
+
+
+@pytest.fixture
+def halvings():
+    return Halvings(prediction=MOCK_PREDICTION).data
+
+
+@pytest.fixture
+def raw():
+    """Daily prices over three cycles, with drawdowns in each."""
+    dates = pd.date_range("2011-01-01", "2021-06-30", freq="D")
+    steps = np.arange(len(dates))
+    closes = np.exp(steps / 1000) * (2 + np.sin(steps / 200))
+    return pd.DataFrame({"Date": dates, "Close": closes})
+
+
+def _chunks(data, size):
+    return [data.iloc[i : i + size] for i in range(0, len(data), size)]
+
+
+def _expected(raw, halvings, **kwargs):
+    return Prices(
+        currency="USD",
+        source="cryptocompare",
+        api_key=None,
+        halvings=halvings,
+        data=raw,
+        **kwargs,
+    ).data
+
+
+class TestMetricsStream:
+    @pytest.mark.parametrize("size", [30, 97, 1000])
+    def test_chunks_match_prices(self, raw, halvings, size):
+        expected = _expected(raw, halvings)
+        stream = MetricsStream(halvings)
+        result = pd.concat(
+            [stream.process(chunk) for chunk in _chunks(raw, size)],
+            ignore_index=True,
+        )
+        lows = stream.lows()
+        result["is_cycle_low"] = result["Date"].isin(lows["Date"])
+        pd.testing.assert_frame_equal(result, expected)
+        assert stream.rows == len(raw)
+
+    def test_intraday_lows_are_daily_minima(self, halvings):
+        dates = pd.date_range("2015-01-01", "2021-06-30", freq="h")
+        steps = np.arange(len(dates))
+        raw = pd.DataFrame(
+            {"Date": dates, "Close": np.exp(steps / 24000) * (2 + np.sin(steps / 4800))}
+        )
+        expected = _expected(raw, halvings, granularity="hour")
+        stream = MetricsStream(halvings, granularity="hour")
+        for chunk in _chunks(raw, 5000):
+            stream.process(chunk)
+        lows = stream.lows()["Date"]
+        expected_lows = expected["Date"][expected["is_cycle_low"]].reset_index(drop=True)
+        # the second lows here lie on the separation boundary, which is
+        # checked at the daily minima
+        assert len(lows) == len(expected_lows)
+        assert ((lows - expected_lows).abs() < pd.Timedelta(days=1)).all()
+
+    def test_chunks_out_of_order_raise(self, raw, halvings):
+        stream = MetricsStream(halvings)
+        stream.process(raw.iloc[100:200])
+        with pytest.raises(ValueError):
+            stream.process(raw.iloc[150:250])
+
+    def test_ongoing_cycle_has_no_lows(self, raw, halvings):
+        stream = MetricsStream(halvings)
+        stream.process(raw[raw["Date"] < "2012-11-01"])
+        assert stream.lows().empty
+
+
+class TestStreamMetrics:
+    def test_writes_prices_data(self, raw, halvings, tmp_path):
+        path = tmp_path / "metrics.parquet"
+        stream_metrics(_chunks(raw, 500), halvings, path, compact=True)
+        result = pd.read_parquet(path)
+        expected = _expected(raw, halvings, compact=True)
+        assert not list(tmp_path.glob("*.partial"))
+        np.testing.assert_array_equal(
+            result["cycle_id"].to_numpy(dtype=float),
+            expected["cycle_id"].to_numpy(dtype=float),
+        )
+        pd.testing.assert_frame_equal(
+            result.drop(columns="cycle_id"), expected.drop(columns="cycle_id")
+        )
+
+    def test_failure_leaves_no_file(self, raw, halvings, tmp_path):
+        chunks = [raw.iloc[100:200], raw.iloc[150:250]]
+        with pytest.raises(ValueError):
+            stream_metrics(chunks, halvings, tmp_path / "metrics.parquet")
+        assert list(tmp_path.iterdir()) == []
+
+    @pytest.mark.parametrize("suffix", [".csv", ".parquet"])
+    def test_read_chunks(self, raw, tmp_path, suffix):
+        path = tmp_path / f"prices{suffix}"
+        if suffix == ".csv":
+            raw.to_csv(path, index=False)
+        else:
+            raw.to_parquet(path, index=False)
+        chunks = list(read_chunks(path, chunk_rows=1000))
+        assert len(chunks) == -(-len(raw) // 1000)
+        pd.testing.assert_frame_equal(
+            pd.concat(chunks, ignore_index=True), raw, check_dtype=False
+        )
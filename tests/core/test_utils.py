@@ -0,0 +1,35 @@
+"""test core utils — behaviour tests"""
+
+import pytest
+
+from btc_cycles.core.utils import atomic_write
+
+
+class TestAtomicWrite:
+    def test_replaces_file(self, tmp_path):
+        path = tmp_path / "nested" / "data.json"
+        with atomic_write(path) as tmp:
+            tmp.write_text("first")
+        with atomic_write(path) as tmp:
+            assert tmp != path and tmp.parent == path.parent
+            tmp.write_text("second")
+        assert path.read_text() == "second"
+        assert list(path.parent.iterdir()) == [path]
+
+    def test_failed_write_keeps_file(self, tmp_path):
+        path = tmp_path / "data.json"
+        path.write_text("kept")
+        with pytest.raises(RuntimeError):
+            with atomic_write(path) as tmp:
+                tmp.write_text("partial")
+                raise RuntimeError("interrupted")
+        assert path.read_text() == "kept"
+        assert list(tmp_path.iterdir()) == [path]
+
+    def test_concurrent_writers_use_their_own_file(self, tmp_path):
+        path = tmp_path / "data.json"
+        with atomic_write(path) as first, atomic_write(path) as second:
+            assert first != second
+            first.write_text("first")
+            second.write_text("second")
+        assert path.read_text() == "first"
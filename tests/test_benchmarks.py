@@ -0,0 +1,52 @@
+"""test benchmarks — smoke tests"""
+
+import json
+
+import pytest
+
+from benchmarks.run import main, run_benchmarks
+from benchmarks.synthetic import synthetic_prices
+
+
+class TestSyntheticPrices:
+    def test_rows_and_frequency(self):
+        data = synthetic_prices(100, freq="h")
+        assert len(data) == 100
+        assert (data["Date"].diff().dropna() == "1h").all()
+        assert (data["Close"] > 0).all()
+
+    def test_seed_is_reproducible(self):
+        assert synthetic_prices(50, seed=1).equals(synthetic_prices(50, seed=1))
+
+
+class TestRunBenchmarks:
+    def test_reports_selected_stages_only(self):
+        records = run_benchmarks(
+            rows=2000, repeat=1, stages=["find_cycle_lows", "chart_model"]
+        )
+        assert [r["stage"] for r in records] == ["find_cycle_lows", "chart_model"]
+        assert all(r["rows"] == 2000 and r["seconds"] >= 0 for r in records)
+        assert all(r["peak_bytes"] > 0 for r in records)
+
+    def test_unknown_stage_raises(self):
+        with pytest.raises(ValueError):
+            run_benchmarks(rows=100, stages=["nope"])
+
+    def test_repeat_below_one_raises(self):
+        with pytest.raises(ValueError):
+            run_benchmarks(rows=100, repeat=0)
+
+    def test_main_rejects_zero_repeat(self, capsys):
+        with pytest.raises(SystemExit):
+            main(["--rows", "100", "--repeat", "0"])
+        assert "--repeat" in capsys.readouterr().err
+
+    def test_main_appends_json_lines(self, tmp_path):
+        output = tmp_path / "results.jsonl"
+        args = ["--rows", "500", "--repeat", "1", "--stages", "fmt_df"]
+        main([*args, "-o", str(output)])
+        main([*args, "-o", str(output)])
+        lines = output.read_text().splitlines()
+        assert len(lines) == 2
+        assert json.loads(lines[0])["stage"] == "fmt_df"
+
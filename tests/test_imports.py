@@ -0,0 +1,32 @@
+"""test import cost — the bare package import must stay cheap"""
+
+import subprocess
+import sys
+
+import pytest
+
+HEAVY_MODULES = ["matplotlib", "plotly", "scipy", "cryptocmd"]
+
+
+def _imported_after(statement: str) -> set[str]:
+    """Top-level modules loaded by `statement` in a fresh interpreter."""
+    code = f"import sys; {statement}; print(' '.join(sys.modules))"
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+    return {name.split(".")[0] for name in out.split()}
+
+
+@pytest.mark.parametrize(
+    "statement",
+    [
+        "import btc_cycles",
+        "from btc_cycles import Bitcoin",
+        "from btc_cycles.core.sources import Source",
+        "from btc_cycles.artist import Artist",
+    ],
+)
+def test_import_does_not_load_backends(statement):
+    loaded = _imported_after(statement)
+    assert not loaded & set(HEAVY_MODULES)
+
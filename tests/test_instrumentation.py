@@ -0,0 +1,118 @@
+"""test instrumentation module — behaviour tests"""
+
+import tracemalloc
+
+import pytest
+
+from btc_cycles.core.bitcoin import Bitcoin
+from btc_cycles.core.sources import Source
+from btc_cycles.instrumentation import (
+    StageRecord,
+    add_hook,
+    instrument,
+    remove_hook,
+    stage,
+)
+from tests.conftest import MOCK_PREDICTION
+
+
+class TestStage:
+    def test_nothing_is_emitted_without_hooks(self, mocker):
+        hook = mocker.Mock()
+        with stage("idle"):
+            pass
+        add_hook(hook)
+        remove_hook(hook)
+        hook.assert_not_called()
+
+    def test_records_are_emitted_innermost_first(self):
+        with instrument() as records:
+            with stage("outer", rows=3):
+                with stage("inner") as record:
+                    record.bytes = 10
+        assert [r.stage for r in records] == ["inner", "outer"]
+        assert records[0].bytes == 10
+        assert records[1].rows == 3
+        assert records[1].wall_time >= records[0].wall_time > 0
+
+    def test_failed_stage_is_emitted_with_its_error(self):
+        with instrument() as records:
+            with pytest.raises(RuntimeError):
+                with stage("outer"):
+                    with stage("failing"):
+                        raise RuntimeError("timed out")
+        assert [r.stage for r in records] == ["failing", "outer"]
+        assert all(r.error == "RuntimeError: timed out" for r in records)
+        assert records[0].wall_time > 0
+
+    def test_completed_stage_has_no_error(self):
+        with instrument() as records:
+            with stage("done"):
+                pass
+        assert records[0].error is None
+
+    def test_hook_receives_records(self, mocker):
+        hook = mocker.Mock()
+        with instrument(hook):
+            with stage("one"):
+                pass
+        hook.assert_called_once()
+        assert isinstance(hook.call_args.args[0], StageRecord)
+
+    def test_peak_alloc_only_when_tracing_memory(self):
+        with instrument() as untraced:
+            with stage("untraced"):
+                pass
+        with instrument(trace_memory=True) as traced:
+            with stage("outer"):
+                with stage("inner"):
+                    block = bytearray(1_000_000)
+                del block
+        assert untraced[0].peak_alloc is None
+        inner, outer = traced
+        assert inner.peak_alloc >= 1_000_000
+        assert outer.peak_alloc >= inner.peak_alloc
+
+
+class TestHooks:
+    def test_tracing_started_elsewhere_is_kept(self, mocker):
+        hook = mocker.Mock()
+        tracemalloc.start()
+        try:
+            add_hook(hook, trace_memory=True)
+            remove_hook(hook, trace_memory=True)
+            assert tracemalloc.is_tracing()
+        finally:
+            tracemalloc.stop()
+
+    def test_mismatched_removal_keeps_tracing_balanced(self, mocker):
+        untraced, traced = mocker.Mock(), mocker.Mock()
+        add_hook(untraced)
+        remove_hook(untraced, trace_memory=True)
+        add_hook(traced, trace_memory=True)
+        assert tracemalloc.is_tracing()
+        remove_hook(traced, trace_memory=True)
+        assert not tracemalloc.is_tracing()
+
+
+class TestPipelineStages:
+    def test_bitcoin_and_plot_stages(self, mocker, raw_prices):
+        mocker.patch(
+            "btc_cycles.core.bitcoin.get_halving_data",
+            return_value=MOCK_PREDICTION,
+        )
+        mocker.patch.object(Source, "_fetch_cryptocompare", return_value=raw_prices)
+
+        with instrument() as records:
+            Bitcoin().plot(kind="interactive")
+
+        stages = {r.stage: r for r in records}
+        assert list(stages) == [
+            "price_fetch",
+            "format",
+            "metrics",
+            "chart_model",
+            "render_interactive",
+        ]
+        assert stages["price_fetch"].rows == len(raw_prices)
+        assert stages["metrics"].rows == len(raw_prices)